@@ -2,12 +2,13 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from flask_migrate import Migrate
 from config import Config
-import json  # Importa el módulo json de Flask
 
 
 db = SQLAlchemy()
 jwt = JWTManager()
+migrate = Migrate()
 
 # Definir el filtro primero
 def replace_keywords(text, keywords):
@@ -15,11 +16,26 @@ def replace_keywords(text, keywords):
         text = text.replace(f'{{{{{keyword}}}}}', replacement)  # Corregido formato de llaves
     return text
 
+def preload_subsystems(app):
+    """
+    Carga por adelantado los subsistemas pesados (SDK de Gemini, pdfkit). Pensado para servidores
+    que crean la app en el proceso maestro y luego hacen fork de los workers.
+    """
+    from app.nlp_utils import get_genai
+    from app.exporters import get_pdfkit_config
+
+    with app.app_context():
+        get_genai()
+        get_pdfkit_config()
+
+
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
-    app.json_encoder = json.JSONEncoder  # Usa el JSONEncoder de Flask
+    # Backend JSON rápido (orjson si está instalado)
+    from app.serializers import FastJSONProvider
+    app.json = FastJSONProvider(app)
 
     
     
@@ -29,6 +45,11 @@ def create_app(config_class=Config):
     # Inicializar extensiones
     db.init_app(app)
     jwt.init_app(app)
+
+    # Rechazar los tokens de cuentas con borrado pendiente
+    from app.account_purge import is_token_revoked
+    jwt.token_in_blocklist_loader(is_token_revoked)
+    migrate.init_app(app, db)
     CORS(app)
     
     # Registrar blueprints
@@ -36,6 +57,29 @@ def create_app(config_class=Config):
     app.register_blueprint(routes)
     app.register_blueprint(main_bp)
 
+    # Contadores incrementales de postulaciones
+    from app.analytics import register_listeners
+    register_listeners()
+
+    # Lápidas de borrado para el feed de sincronización
+    from app.sync import register_listeners as register_sync_listeners
+    register_sync_listeners()
+
+    # Cola de re-puntaje de postulaciones al cambiar habilidades o experiencia
+    from app.rescoring import register_listeners as register_rescore_listeners
+    register_rescore_listeners()
+
+    # Spans por petición y por etapa de generate-cv
+    from app.tracing import init_tracing
+    init_tracing(app)
+
+    # Registrar comandos de la CLI (flask import-profiles, ...)
+    from app.commands import register_commands
+    register_commands(app)
+
+    if app.config.get('PRELOAD_SUBSYSTEMS'):
+        preload_subsystems(app)
+
     return app  # Corregida indentación
 
 
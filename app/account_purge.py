@@ -0,0 +1,122 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import delete, select
+from app import db
+from app.models import (User, Profile, Resume, Postulacion, JobApplication, CvAnalysis, WorkExperience, Education,
+                        Language, Skill, Certificate, SkillCategory, SyncTombstone)
+from app.analytics import forget_user
+
+PURGE_BATCH_SIZE = 500
+
+# Tablas hijas en orden de borrado: (modelo, columna del dueño, 'user' o 'profile')
+PURGE_PLAN = [
+    (CvAnalysis, CvAnalysis.user_id, 'user'),
+    (JobApplication, JobApplication.user_id, 'user'),
+    (Resume, Resume.user_id, 'user'),
+    (Postulacion, Postulacion.usuario_id, 'user'),
+    (WorkExperience, WorkExperience.profile_id, 'profile'),
+    (Education, Education.profile_id, 'profile'),
+    (Language, Language.profile_id, 'profile'),
+    (Skill, Skill.profile_id, 'profile'),
+    (Certificate, Certificate.profile_id, 'profile'),
+    (SkillCategory, SkillCategory.profile_id, 'profile'),
+    (SyncTombstone, SyncTombstone.user_id, 'user'),
+]
+
+# Un solo hilo: las purgas se ejecutan de a una para no competir por la base de datos
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='account-purge')
+
+# Resultado de la verificación de revocación por usuario: {user_id: (vence (monotonic), revocado)}
+_revocations = {}
+_revocations_lock = threading.Lock()
+MAX_CACHED_REVOCATIONS = 10000
+
+
+def _delete_in_batches(model, owner_column, owner_id, batch_size):
+    """
+    Borra las filas del dueño en lotes acotados, confirmando cada lote para no mantener bloqueos largos.
+    """
+    total = 0
+    while True:
+        ids = select(model.id).where(owner_column == owner_id).limit(batch_size).scalar_subquery()
+        result = db.session.execute(delete(model).where(model.id.in_(ids)))
+        db.session.commit()
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
+
+
+def purge_account(user_id, batch_size=PURGE_BATCH_SIZE):
+    """
+    Elimina una cuenta y todos sus datos. Los hijos se borran por lotes y, al final, el borrado del
+    usuario deja que ON DELETE CASCADE limpie lo que quede.
+    """
+    profile_id = db.session.scalar(select(Profile.id).where(Profile.user_id == user_id))
+
+    # Los borrados masivos no pasan por los listeners: descontar primero las estadísticas
+    forget_user(user_id)
+    db.session.commit()
+
+    deleted = {}
+    for model, owner_column, owner in PURGE_PLAN:
+        owner_id = profile_id if owner == 'profile' else user_id
+        if owner_id is not None:
+            deleted[model.__tablename__] = _delete_in_batches(model, owner_column, owner_id, batch_size)
+
+    db.session.execute(delete(Profile).where(Profile.user_id == user_id))
+    db.session.execute(delete(User).where(User.id == user_id))
+    db.session.commit()
+    return deleted
+
+
+def request_account_deletion(app, user):
+    """
+    Marca la cuenta para borrado y programa la purga en segundo plano.
+    """
+    user.deletion_requested_at = datetime.utcnow()
+    db.session.commit()
+    with _revocations_lock:
+        _revocations[user.id] = (float('inf'), True)
+    return _executor.submit(_run_purge, app, user.id)
+
+
+def _run_purge(app, user_id):
+    with app.app_context():
+        try:
+            return purge_account(user_id)
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception("Error al purgar la cuenta %s", user_id)
+            raise
+
+
+def is_token_revoked(jwt_header, jwt_payload):
+    """
+    Cargador token_in_blocklist de flask_jwt_extended: los tokens emitidos antes de pedir el borrado
+    (o de una cuenta ya purgada) dejan de ser válidos mientras la purga está pendiente.
+    El resultado se guarda TOKEN_REVOCATION_CACHE_SECONDS por usuario para no consultar la base de datos en
+    cada petición; en el proceso que recibe el pedido de borrado la revocación es inmediata y en los demás
+    tarda como mucho ese tiempo.
+    """
+    try:
+        user_id = int(jwt_payload['sub'])
+    except (KeyError, TypeError, ValueError):
+        return True
+    now = time.monotonic()
+    cached = _revocations.get(user_id)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    row = db.session.execute(select(User.deletion_requested_at).where(User.id == user_id)).first()
+    revoked = row is None or row.deletion_requested_at is not None
+    with _revocations_lock:
+        if len(_revocations) >= MAX_CACHED_REVOCATIONS:
+            _revocations.clear()
+        _revocations[user_id] = (now + current_app.config['TOKEN_REVOCATION_CACHE_SECONDS'], revoked)
+    return revoked
+
+
+def pending_deletions():
+    return db.session.scalars(select(User.id).where(User.deletion_requested_at.isnot(None))).all()
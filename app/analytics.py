@@ -0,0 +1,199 @@
+from collections import defaultdict
+from sqlalchemy import event, func, select, delete, case, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app import db
+from app.models import Postulacion, JobApplication, ApplicationStat
+
+GLOBAL_SCOPE = 0
+NO_VALUE = '(sin dato)'
+
+# modelo -> (kind, {dimensión: atributo})
+TRACKED = {
+    Postulacion: ('postulacion', {'estado': 'estado', 'company': 'empresa'}),
+    JobApplication: ('job_application', {'status': 'status', 'source': 'source', 'company': 'company'}),
+}
+USER_ATTRS = {Postulacion: 'usuario_id', JobApplication: 'user_id'}
+
+
+def match_bucket(match):
+    if match is None:
+        return None
+    low = min(max(int(match), 0) // 10 * 10, 90)
+    return f'{low}-{100 if low == 90 else low + 9}'
+
+
+def _contributions(model, values):
+    """
+    Devuelve las filas de application_stats a las que aporta una postulación: [(dimension, value, match)].
+    """
+    kind, dimensions = TRACKED[model]
+    match = values.get('match_percentage')
+    rows = [(dimension, values.get(attr) or NO_VALUE, match) for dimension, attr in dimensions.items()]
+    if model is JobApplication and match is not None:
+        rows.append(('match_bucket', match_bucket(match), match))
+    return kind, rows
+
+
+def _attr_names(model):
+    names = list(TRACKED[model][1].values()) + [USER_ATTRS[model]]
+    if model is JobApplication:
+        names.append('match_percentage')
+    return names
+
+
+def _current_values(obj):
+    return {name: getattr(obj, name) for name in _attr_names(type(obj))}
+
+
+def _previous_values(obj):
+    state = db.inspect(obj)
+    values = {}
+    for name in _attr_names(type(obj)):
+        history = state.attrs[name].history
+        if history.deleted:
+            values[name] = history.deleted[0]
+        elif history.unchanged:
+            values[name] = history.unchanged[0]
+        elif history.added:
+            values[name] = None
+        else:
+            values[name] = getattr(obj, name)
+    return values
+
+
+def _add(deltas, obj, values, sign):
+    model = type(obj)
+    user_id = values[USER_ATTRS[model]]
+    if user_id is not None:
+        # get_jwt_identity() devuelve el id como texto: "5" y 5 deben caer en la misma fila
+        user_id = int(user_id)
+    kind, rows = _contributions(model, values)
+    for dimension, value, match in rows:
+        for scope in (user_id, GLOBAL_SCOPE):
+            delta = deltas[(scope, kind, dimension, str(value)[:200])]
+            delta[0] += sign
+            if match is not None:
+                delta[1] += sign * int(match)
+                delta[2] += sign
+
+
+def _collect_deltas(session, flush_context, instances):
+    # Se reinicia en cada flush para no arrastrar deltas de un flush fallido
+    deltas = session.info['application_stats_deltas'] = defaultdict(lambda: [0, 0, 0])
+    for obj in session.new:
+        if type(obj) in TRACKED:
+            _add(deltas, obj, _current_values(obj), 1)
+    for obj in session.deleted:
+        if type(obj) in TRACKED:
+            _add(deltas, obj, _previous_values(obj), -1)
+    for obj in session.dirty:
+        if type(obj) in TRACKED and session.is_modified(obj):
+            old, new = _previous_values(obj), _current_values(obj)
+            if old != new:
+                _add(deltas, obj, old, -1)
+                _add(deltas, obj, new, 1)
+
+
+def apply_deltas(connection, deltas):
+    # Orden fijo de las filas: dos transacciones que tocan las mismas filas (p. ej. las globales)
+    # las bloquean en el mismo orden y no se produce un interbloqueo
+    rows = [
+        {'user_id': scope, 'kind': kind, 'dimension': dimension, 'value': value,
+         'count': count, 'match_sum': match_sum, 'match_count': match_count}
+        for (scope, kind, dimension, value), (count, match_sum, match_count)
+        in sorted(deltas.items(), key=lambda item: (item[0][0] or 0,) + item[0][1:])
+        if count or match_sum or match_count
+    ]
+    if not rows:
+        return
+    stmt = insert(ApplicationStat.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id', 'kind', 'dimension', 'value'],
+        set_={
+            'count': ApplicationStat.__table__.c.count + stmt.excluded.count,
+            'match_sum': ApplicationStat.__table__.c.match_sum + stmt.excluded.match_sum,
+            'match_count': ApplicationStat.__table__.c.match_count + stmt.excluded.match_count,
+        }
+    )
+    connection.execute(stmt, rows)
+
+
+def _flush_deltas(session, flush_context):
+    deltas = session.info.pop('application_stats_deltas', None)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+def register_listeners():
+    """
+    Mantiene application_stats en la misma transacción en la que se crean, modifican o borran postulaciones.
+    Las escrituras masivas que no pasan por el ORM deben usar rebuild_application_stats().
+    """
+    if not event.contains(Session, 'before_flush', _collect_deltas):
+        event.listen(Session, 'before_flush', _collect_deltas)
+        event.listen(Session, 'after_flush', _flush_deltas)
+
+
+def get_application_stats(user_id=GLOBAL_SCOPE):
+    """
+    Lee los contadores precalculados de un usuario (o globales) agrupados por tipo y dimensión.
+    """
+    stats = {'postulacion': {}, 'job_application': {}}
+    rows = ApplicationStat.query.filter(ApplicationStat.user_id == user_id, ApplicationStat.count > 0).all()
+    for row in rows:
+        stats[row.kind].setdefault(row.dimension, {})[row.value] = {
+            'count': row.count,
+            'avg_match': round(row.match_sum / row.match_count, 1) if row.match_count else None
+        }
+    return stats
+
+
+def forget_user(user_id, connection=None):
+    """
+    Descuenta de los totales globales lo aportado por un usuario y borra sus contadores.
+    Se usa antes de eliminar la cuenta con borrados masivos que no disparan los listeners.
+    """
+    connection = connection or db.session.connection()
+    rows = connection.execute(
+        select(ApplicationStat.kind, ApplicationStat.dimension, ApplicationStat.value,
+               ApplicationStat.count, ApplicationStat.match_sum, ApplicationStat.match_count)
+        .where(ApplicationStat.user_id == user_id)
+    ).all()
+    deltas = {(GLOBAL_SCOPE, kind, dimension, value): [-count, -match_sum, -match_count]
+              for kind, dimension, value, count, match_sum, match_count in rows}
+    apply_deltas(connection, deltas)
+    connection.execute(delete(ApplicationStat).where(ApplicationStat.user_id == user_id))
+
+
+def rebuild_application_stats():
+    """
+    Recalcula application_stats desde cero con GROUP BY (para el llenado inicial o tras cargas masivas).
+    """
+    db.session.execute(delete(ApplicationStat))
+    deltas = defaultdict(lambda: [0, 0, 0])
+
+    for model, (kind, dimensions) in TRACKED.items():
+        user_col = getattr(model, USER_ATTRS[model])
+        match_col = model.match_percentage if model is JobApplication else None
+        group_cols = [(dimension, getattr(model, attr)) for dimension, attr in dimensions.items()]
+        if match_col is not None:
+            bucket = case((match_col >= 90, 90), else_=func.greatest(match_col, 0) / 10 * 10)
+            group_cols.append(('match_bucket', bucket))
+
+        for dimension, column in group_cols:
+            aggregates = [func.count(), func.coalesce(func.sum(match_col), 0), func.count(match_col)] if match_col is not None else [func.count(), literal(0), literal(0)]
+            query = select(user_col, column, *aggregates).group_by(user_col, column)
+            if dimension == 'match_bucket':
+                query = query.where(match_col.isnot(None))
+            for user_id, value, count, match_sum, match_count in db.session.execute(query):
+                if dimension == 'match_bucket':
+                    value = match_bucket(value)
+                for scope in (user_id, GLOBAL_SCOPE):
+                    delta = deltas[(scope, kind, dimension, str(value or NO_VALUE)[:200])]
+                    delta[0] += count
+                    delta[1] += int(match_sum)
+                    delta[2] += match_count
+
+    apply_deltas(db.session.connection(), deltas)
+    db.session.commit()
@@ -0,0 +1,348 @@
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from itertools import islice
+from sqlalchemy import insert, select, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models import User, Profile, WorkExperience, Education, Language, Certificate, SkillCategory
+from app.reference_cache import get_reference_cache
+from app.rescoring import enqueue
+from app.utils import normalize_skill_name
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+_DATE_FORMATS = ('%Y-%m-%d', '%Y-%m', '%Y')
+
+
+def _hash_password(password):
+    # Mismo método que el endpoint de registro; se ejecuta en un proceso aparte
+    return generate_password_hash(password, method='pbkdf2:sha256')
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Formato de fecha inválido: {value}')
+
+
+# Niveles de idioma de LinkedIn y JSON Resume más largos que languages.level
+_FLUENCY_LEVELS = {
+    'native or bilingual proficiency': 'Nativo',
+    'native speaker': 'Nativo',
+    'full professional proficiency': 'Avanzado',
+    'professional working proficiency': 'Profesional',
+    'limited working proficiency': 'Intermedio',
+    'elementary proficiency': 'Básico',
+}
+
+
+def _language_level(fluency):
+    # Un nivel desconocido y demasiado largo se recorta en lugar de rechazar todo el perfil
+    if not isinstance(fluency, str):
+        return ''
+    fluency = fluency.strip()
+    level = _FLUENCY_LEVELS.get(fluency.casefold(), fluency)
+    return level[:Language.__table__.c.level.type.length]
+
+
+def _split(value, sep=';'):
+    return [item.strip() for item in (value or '').split(sep) if item.strip()]
+
+
+def _normalize_document(doc, label):
+    # Un elemento que no es un objeto JSON Resume se informa como error del registro
+    try:
+        return normalize_json_resume(doc)
+    except (AttributeError, TypeError) as e:
+        return {'errors': [f'{label}: documento inválido ({e})']}
+
+
+def iter_jsonl_records(stream):
+    """
+    Lee perfiles en formato JSON Lines (un JSON Resume por línea) sin cargar el archivo completo.
+    También acepta un arreglo JSON, que sí se carga en memoria.
+    """
+    first = stream.read(1)
+    while first and first.isspace():
+        first = stream.read(1)
+    if first == '[':
+        for index, doc in enumerate(json.loads(first + stream.read()), 1):
+            yield _normalize_document(doc, f'Elemento {index}')
+        return
+
+    line_no = 0
+    pending = first
+    for line in stream:
+        line_no += 1
+        line = pending + line
+        pending = ''
+        if not line.strip():
+            continue
+        try:
+            doc = json.loads(line)
+        except ValueError as e:
+            yield {'errors': [f'Línea {line_no}: JSON inválido ({e})']}
+            continue
+        yield _normalize_document(doc, f'Línea {line_no}')
+
+
+def iter_csv_records(stream):
+    """
+    Lee perfiles desde CSV con columnas planas. Las listas de habilidades se separan con ';'.
+    """
+    for row in csv.DictReader(stream):
+        yield normalize_csv_row(row)
+
+
+def normalize_json_resume(doc):
+    basics = doc.get('basics', {})
+    location = basics.get('location') or {}
+    profiles = {p.get('network', '').lower(): p.get('url') for p in basics.get('profiles', [])}
+
+    tech, soft = [], []
+    for skill in doc.get('skills', []):
+        target = soft if skill.get('type') == 'soft' else tech
+        target.extend(skill.get('keywords') or [skill.get('name')])
+
+    return {
+        'user': {
+            'name': basics.get('name'),
+            'email': basics.get('email'),
+            'password': doc.get('password') or basics.get('password'),
+            'phone': basics.get('phone'),
+            'address': location.get('address'),
+        },
+        'profile': {
+            'headline': basics.get('label'),
+            'linkedin_url': profiles.get('linkedin'),
+            'github_url': profiles.get('github'),
+        },
+        'work': [{
+            'company': w.get('name') or w.get('company'),
+            'position': w.get('position'),
+            'start_date': w.get('startDate'),
+            'end_date': w.get('endDate'),
+            'description': w.get('summary'),
+        } for w in doc.get('work', [])],
+        'education': [{
+            'institution': e.get('institution'),
+            'degree': ' '.join(filter(None, [e.get('studyType'), e.get('area')])),
+            'start_date': e.get('startDate'),
+            'end_date': e.get('endDate'),
+            'description': e.get('score'),
+        } for e in doc.get('education', [])],
+        'languages': [{
+            'language': l.get('language'),
+            'level': _language_level(l.get('fluency')),
+        } for l in doc.get('languages', [])],
+        'certificates': [{
+            'name': c.get('name'),
+            'institution': c.get('issuer'),
+            'date': c.get('date'),
+            'url': c.get('url'),
+        } for c in doc.get('certificates', [])],
+        'skills_tech': tech,
+        'skills_soft': soft,
+    }
+
+
+def normalize_csv_row(row):
+    return {
+        'user': {
+            'name': row.get('name'),
+            'email': row.get('email'),
+            'password': row.get('password'),
+            'phone': row.get('phone'),
+            'address': row.get('address'),
+        },
+        'profile': {
+            'headline': row.get('headline'),
+            'linkedin_url': row.get('linkedin_url'),
+            'github_url': row.get('github_url'),
+        },
+        'work': [], 'education': [], 'languages': [], 'certificates': [],
+        'skills_tech': _split(row.get('skills_tech')),
+        'skills_soft': _split(row.get('skills_soft')),
+    }
+
+
+def _length_errors(model, row, label):
+    # Un valor más largo que su columna haría fallar la inserción de todo el lote
+    errors = []
+    for key, value in row.items():
+        column = model.__table__.c.get(key)
+        if column is None or not isinstance(column.type, String) or not column.type.length:
+            continue
+        if isinstance(value, str) and len(value) > column.type.length:
+            errors.append(f'{label}: el campo {key} supera los {column.type.length} caracteres')
+    return errors
+
+
+def validate_record(record):
+    """
+    Valida un registro normalizado y convierte sus fechas. Devuelve la lista de errores encontrados.
+    """
+    errors = list(record.get('errors', []))
+    if errors:
+        return errors
+
+    user = record['user']
+    for key in ('name', 'email', 'password'):
+        if not isinstance(user.get(key), str) or not user[key].strip():
+            errors.append(f'Falta el campo {key}')
+
+    errors.extend(_length_errors(User, user, 'Usuario'))
+    errors.extend(_length_errors(Profile, record['profile'], 'Perfil'))
+    for model, key, label in ((WorkExperience, 'work', 'Experiencia laboral'), (Education, 'education', 'Educación'),
+                              (Language, 'languages', 'Idioma'), (Certificate, 'certificates', 'Certificado')):
+        for row in record[key]:
+            errors.extend(_length_errors(model, row, label))
+
+    try:
+        for exp in record['work']:
+            if not exp['company'] or not exp['position'] or not exp['start_date']:
+                errors.append('Experiencia laboral sin empresa, cargo o fecha de inicio')
+            exp['start_date'] = _parse_date(exp['start_date'])
+            exp['end_date'] = _parse_date(exp['end_date'])
+            exp['current_job'] = exp['end_date'] is None
+        for edu in record['education']:
+            if not edu['institution'] or not edu['degree'] or not edu['start_date']:
+                errors.append('Educación sin institución, título o fecha de inicio')
+            edu['start_date'] = _parse_date(edu['start_date'])
+            edu['end_date'] = _parse_date(edu['end_date'])
+        for cert in record['certificates']:
+            if not cert['name'] or not cert['institution']:
+                errors.append('Certificado sin nombre o institución')
+            cert['date'] = _parse_date(cert['date'])
+    except ValueError as e:
+        errors.append(str(e))
+
+    if any(not lang['language'] for lang in record['languages']):
+        errors.append('Idioma sin nombre')
+
+    return errors
+
+
+def _load_batch(records, hash_map):
+    """
+    Inserta un lote de registros válidos con inserciones multi-fila. Devuelve la cantidad de usuarios creados.
+    """
+    hashes = hash_map(_hash_password, [r['user']['password'] for r in records])
+
+    user_rows = []
+    for record, password_hash in zip(records, hashes):
+        user = record['user']
+        user_rows.append({
+            'name': user['name'].strip(),
+            'email': user['email'].strip(),
+            'password_hash': password_hash,
+            'phone': user.get('phone'),
+            'address': user.get('address'),
+        })
+
+    # Un email creado por otra petición después de la verificación previa se omite en lugar de fallar
+    users_table = User.__table__
+    stmt = pg_insert(users_table).on_conflict_do_nothing(index_elements=['email'])
+    result = db.session.execute(stmt.returning(users_table.c.id, users_table.c.email), user_rows)
+    user_ids = {email: user_id for user_id, email in result}
+    records = [r for r in records if r['user']['email'].strip() in user_ids]
+    if not records:
+        db.session.commit()
+        return 0
+
+    profiles_table = Profile.__table__
+    profile_rows = [dict(r['profile'], user_id=user_ids[r['user']['email'].strip()]) for r in records]
+    result = db.session.execute(insert(profiles_table).returning(profiles_table.c.id, profiles_table.c.user_id), profile_rows)
+    profile_ids = {user_id: profile_id for profile_id, user_id in result}
+
+    cache = get_reference_cache()
+    tech_type_id, soft_type_id = cache.skill_type_id('tech'), cache.skill_type_id('soft')
+    children = {WorkExperience: [], Education: [], Language: [], Certificate: [], SkillCategory: []}
+    for record in records:
+        profile_id = profile_ids[user_ids[record['user']['email'].strip()]]
+        children[WorkExperience].extend(dict(exp, profile_id=profile_id) for exp in record['work'])
+        children[Education].extend(dict(edu, profile_id=profile_id) for edu in record['education'])
+        children[Language].extend(dict(lang, profile_id=profile_id) for lang in record['languages'])
+        children[Certificate].extend(dict(cert, profile_id=profile_id) for cert in record['certificates'])
+        for skill_type_id, skills in ((tech_type_id, record['skills_tech']), (soft_type_id, record['skills_soft'])):
+            if skills:
+                names = list(dict.fromkeys(normalize_skill_name(s) for s in skills if s))
+                children[SkillCategory].append({'profile_id': profile_id, 'skill_type_id': skill_type_id, 'skills': names})
+
+    for model, rows in children.items():
+        if rows:
+            db.session.execute(insert(model.__table__), rows)
+
+    # Las inserciones Core no pasan por los eventos del ORM: el índice profile_skill_experience de los
+    # perfiles con experiencia lo completa flask rescore desde la cola, sin demora
+    with_experience = {(row['profile_id'], 'experience') for row in children[WorkExperience]}
+    enqueue(db.session.connection(), with_experience, debounce=0)
+
+    db.session.commit()
+    return len(records)
+
+
+def import_profiles(records, batch_size=BATCH_SIZE, workers=None):
+    """
+    Importa perfiles de forma masiva: valida por lotes, calcula los hashes de contraseña en un
+    pool de procesos y carga users, profiles y tablas hijas con inserciones por conjunto.
+    Con workers=0 los hashes se calculan en el proceso actual (sin crear procesos).
+    """
+    if workers == 0:
+        return _import_profiles(records, batch_size, map)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return _import_profiles(records, batch_size, partial(executor.map, chunksize=64))
+
+
+def _import_profiles(records, batch_size, hash_map):
+    stats = {'imported': 0, 'skipped': 0, 'errors': []}
+    seen_emails = set()
+    position = 0
+
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            break
+
+        valid = []
+        for record in batch:
+            position += 1
+            errors = validate_record(record)
+            email = None if errors else record['user']['email'].strip()
+            if not errors and email in seen_emails:
+                errors = ['Email duplicado en el archivo']
+            if errors:
+                stats['skipped'] += 1
+                if len(stats['errors']) < MAX_REPORTED_ERRORS:
+                    stats['errors'].append({'record': position, 'errors': errors})
+                continue
+            seen_emails.add(email)
+            valid.append(record)
+
+        # Omitir emails que ya existen en la base de datos (evita calcular sus hashes)
+        emails = [r['user']['email'].strip() for r in valid]
+        existing = set(db.session.scalars(select(User.email).where(User.email.in_(emails)))) if emails else set()
+        new_records = [r for r in valid if r['user']['email'].strip() not in existing]
+
+        imported = 0
+        if new_records:
+            try:
+                imported = _load_batch(new_records, hash_map)
+            except Exception:
+                db.session.rollback()
+                raise
+        stats['imported'] += imported
+        stats['skipped'] += len(valid) - imported
+
+    return stats
@@ -0,0 +1,204 @@
+import json
+import click
+from flask.cli import with_appcontext
+
+
+@click.command('import-profiles')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['jsonl', 'csv']), default='jsonl', help='Formato del archivo de entrada.')
+@click.option('--batch-size', default=1000, show_default=True, help='Registros por lote.')
+@click.option('--workers', default=None, type=int, help='Procesos para calcular los hashes de contraseña.')
+@with_appcontext
+def import_profiles_command(path, fmt, batch_size, workers):
+    """Importa perfiles de forma masiva desde JSON Lines (JSON Resume) o CSV."""
+    from app.bulk_import import import_profiles, iter_jsonl_records, iter_csv_records
+
+    reader = iter_csv_records if fmt == 'csv' else iter_jsonl_records
+    with open(path, encoding='utf-8', newline='') as stream:
+        stats = import_profiles(reader(stream), batch_size=batch_size, workers=workers)
+    click.echo(json.dumps(stats, ensure_ascii=False, indent=2))
+
+
+@click.command('export-ndjson')
+@click.argument('entity', type=click.Choice(['users', 'profiles', 'postulaciones', 'job_applications']))
+@click.option('-o', '--output', type=click.Path(dir_okay=False), required=True, help='Archivo de salida.')
+@click.option('--gzip', 'use_gzip', is_flag=True, help='Comprime la salida con gzip.')
+@click.option('--yield-per', default=1000, show_default=True, help='Filas por lote del cursor.')
+@with_appcontext
+def export_ndjson_command(entity, output, use_gzip, yield_per):
+    """Exporta una tabla completa como JSON Lines con memoria constante."""
+    from app.ndjson_export import iter_ndjson, gzip_stream
+
+    chunks = iter_ndjson(entity, yield_per=yield_per)
+    if use_gzip:
+        chunks = gzip_stream(chunks)
+    with open(output, 'wb') as out:
+        for chunk in chunks:
+            out.write(chunk)
+
+
+@click.command('rebuild-application-stats')
+@with_appcontext
+def rebuild_application_stats_command():
+    """Recalcula desde cero los contadores de postulaciones."""
+    from app.analytics import rebuild_application_stats
+
+    rebuild_application_stats()
+    click.echo('Contadores de postulaciones recalculados')
+
+
+@click.command('explain-check')
+@click.option('--rows', default=20000, show_default=True, help='Usuarios sintéticos a sembrar.')
+@click.option('--min-table-rows', default=1000, show_default=True, help='Filas a partir de las cuales una tabla se considera grande.')
+@with_appcontext
+def explain_check_command(rows, min_table_rows):
+    """
+    Ejecuta EXPLAIN sobre las consultas de las rutas y falla si hay Seq Scan en tablas grandes o si una
+    consulta no usa los índices que se esperan para ella.
+    Usar una base de datos descartable (DATABASE_URL); al terminar se vuelve a ejecutar ANALYZE.
+    """
+    from app.explain_check import run_explain_check
+
+    failures = 0
+    for name, scans, missing in run_explain_check(rows=rows, min_table_rows=min_table_rows):
+        if scans or missing:
+            failures += 1
+            problems = [f'Seq Scan sobre {", ".join(scans)}'] if scans else []
+            problems += [f'no usa {", ".join(missing)}'] if missing else []
+            click.echo(f'FALLA  {name}: {"; ".join(problems)}')
+        else:
+            click.echo(f'OK     {name}')
+    if failures:
+        raise SystemExit(1)
+
+
+@click.command('startup-bench')
+@click.option('--runs', default=5, show_default=True, help='Procesos a medir.')
+@with_appcontext
+def startup_bench_command(runs):
+    """Verifica el presupuesto de tiempo y memoria de create_app()."""
+    import os
+    from flask import current_app
+    from app.startup_bench import measure_startup
+
+    result = measure_startup(os.path.dirname(current_app.root_path), runs=runs)
+    time_budget = current_app.config['STARTUP_TIME_BUDGET_MS']
+    memory_budget = current_app.config['STARTUP_MEMORY_BUDGET_MB']
+    click.echo(f"Arranque: {result['ms']:.0f} ms (presupuesto {time_budget} ms), "
+               f"memoria máxima: {result['max_rss_mb']:.1f} MB (presupuesto {memory_budget} MB)")
+
+    errors = []
+    if result['ms'] > time_budget:
+        errors.append('se superó el presupuesto de tiempo')
+    if result['max_rss_mb'] > memory_budget:
+        errors.append('se superó el presupuesto de memoria')
+    if result['heavy']:
+        errors.append(f"módulos cargados al arrancar: {', '.join(result['heavy'])}")
+    if errors:
+        click.echo('FALLA: ' + '; '.join(errors))
+        raise SystemExit(1)
+
+
+@click.command('prune-tombstones')
+@with_appcontext
+def prune_tombstones_command():
+    """Borra las lápidas de sincronización más antiguas que la retención configurada."""
+    from flask import current_app
+    from app.sync import prune_tombstones
+
+    deleted = prune_tombstones(current_app.config['SYNC_TOMBSTONE_RETENTION_DAYS'])
+    click.echo(f'{deleted} lápidas eliminadas')
+
+
+@click.command('purge-accounts')
+@click.option('--user-id', type=int, default=None, help='Purga solo esta cuenta.')
+@click.option('--batch-size', default=500, show_default=True, help='Filas por lote de borrado.')
+@with_appcontext
+def purge_accounts_command(user_id, batch_size):
+    """Elimina por lotes las cuentas marcadas para borrado (o la indicada)."""
+    from app.account_purge import purge_account, pending_deletions
+
+    for pending_id in [user_id] if user_id else pending_deletions():
+        deleted = purge_account(pending_id, batch_size=batch_size)
+        click.echo(f'Cuenta {pending_id} eliminada: {json.dumps(deleted)}')
+
+
+@click.command('parse-job-postings')
+@click.option('--limit', default=None, type=int, help='Cantidad máxima de puestos a analizar.')
+@with_appcontext
+def parse_job_postings_command(limit):
+    """Extrae con la IA (prioridad batch) los requisitos de los puestos aún no analizados."""
+    from app import db
+    from app.job_postings import pending_postings, parse_posting
+
+    parsed = failed = 0
+    for posting in pending_postings(limit):
+        if parse_posting(posting, priority='batch'):
+            parsed += 1
+        else:
+            failed += 1
+        db.session.commit()
+    click.echo(f'{parsed} puestos analizados, {failed} con error')
+
+
+@click.command('rescore')
+@click.option('--batch-size', default=100, show_default=True, help='Entradas de la cola por lote.')
+@click.option('--all', 'rescore_all', is_flag=True, help='Encola todos los perfiles con postulaciones antes de procesar.')
+@click.option('--watch', is_flag=True, help='Sigue procesando la cola hasta interrumpirlo.')
+@with_appcontext
+def rescore_command(batch_size, rescore_all, watch):
+    """Re-puntúa las postulaciones de los perfiles modificados (cola rescore_queue)."""
+    import time
+    from flask import current_app
+    from app.rescoring import enqueue_all, process_rescore_queue
+
+    if rescore_all:
+        click.echo(f'{enqueue_all()} entradas encoladas')
+    while True:
+        stats = process_rescore_queue(batch_size=batch_size)
+        if stats['entries']:
+            click.echo(json.dumps(stats))
+            continue
+        if not watch:
+            break
+        time.sleep(current_app.config['RESCORE_POLL_SECONDS'])
+
+
+@click.command('rebuild-skill-experience')
+@click.option('--batch-size', default=500, show_default=True, help='Perfiles por lote.')
+@with_appcontext
+def rebuild_skill_experience_command(batch_size):
+    """Recalcula profile_skill_experience para todos los perfiles (p. ej. tras cambiar el catálogo)."""
+    from app.skill_experience import rebuild_all_skill_experience
+
+    click.echo(json.dumps(rebuild_all_skill_experience(batch_size=batch_size)))
+
+
+@click.command('load-skill-catalog')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default='csv', help='Formato del archivo de entrada.')
+@click.option('--batch-size', default=5000, show_default=True, help='Habilidades por lote.')
+@click.option('--default-type', default=None, help='Tipo para las filas sin tipo reconocido (tech o soft).')
+@with_appcontext
+def load_skill_catalog_command(path, fmt, batch_size, default_type):
+    """Carga o actualiza el catálogo standard_skills (y sus alias) desde un archivo de taxonomía."""
+    from app.skill_catalog import load_catalog, iter_catalog_csv, iter_catalog_jsonl
+
+    reader = iter_catalog_csv if fmt == 'csv' else iter_catalog_jsonl
+    with open(path, encoding='utf-8', newline='') as stream:
+        stats = load_catalog(reader(stream), batch_size=batch_size, default_type=default_type)
+    click.echo(json.dumps(stats, ensure_ascii=False, indent=2))
+
+
+def register_commands(app):
+    app.cli.add_command(import_profiles_command)
+    app.cli.add_command(export_ndjson_command)
+    app.cli.add_command(rebuild_application_stats_command)
+    app.cli.add_command(explain_check_command)
+    app.cli.add_command(startup_bench_command)
+    app.cli.add_command(prune_tombstones_command)
+    app.cli.add_command(purge_accounts_command)
+    app.cli.add_command(parse_job_postings_command)
+    app.cli.add_command(rescore_command)
+    app.cli.add_command(rebuild_skill_experience_command)
+    app.cli.add_command(load_skill_catalog_command)
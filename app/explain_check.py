@@ -0,0 +1,152 @@
+from sqlalchemy import select, text, func
+from app import db
+from app.models import (User, Profile, Resume, Postulacion, WorkExperience, Education, Language, Certificate,
+                        Skill, SkillCategory, StandardSkill, JobApplication, CvAnalysis, ApplicationStat, JobPosting)
+from app.skill_experience import experience_query
+from app.reference_cache import get_reference_cache
+
+SEED_DOMAIN = '@explain-check.local'
+
+# Datos sintéticos para que el planificador vea tablas de tamaño realista. Todo se ejecuta dentro
+# de una transacción que se revierte al final.
+SEED_STATEMENTS = [
+    """INSERT INTO skill_types (id, name) VALUES (1, 'Técnica'), (2, 'Blanda') ON CONFLICT DO NOTHING""",
+    """INSERT INTO users (name, email, password_hash, created_at, updated_at)
+       SELECT 'Seed ' || g, 'seed' || g || '{domain}', 'x', now(), now() FROM generate_series(1, :rows) g""",
+    """CREATE TEMP TABLE explain_users ON COMMIT DROP AS
+       SELECT id FROM users WHERE email LIKE 'seed%{domain}'""",
+    """INSERT INTO profiles (user_id, headline, updated_at) SELECT id, 'Headline', now() FROM explain_users""",
+    """CREATE TEMP TABLE explain_profiles ON COMMIT DROP AS
+       SELECT p.id, p.user_id FROM profiles p JOIN explain_users u ON u.id = p.user_id""",
+    """INSERT INTO work_experience (profile_id, company, position, start_date, description, current_job)
+       SELECT p.id, 'Empresa ' || k, 'Cargo', date '2015-01-01' + k * 365, 'Python y SQL', k = 3
+       FROM explain_profiles p CROSS JOIN generate_series(1, 3) k""",
+    """INSERT INTO education (profile_id, institution, degree, start_date)
+       SELECT p.id, 'Universidad', 'Ingeniería ' || k, date '2010-03-01' FROM explain_profiles p CROSS JOIN generate_series(1, 2) k""",
+    """INSERT INTO languages (profile_id, language, level)
+       SELECT p.id, 'Idioma ' || k, 'B2' FROM explain_profiles p CROSS JOIN generate_series(1, 2) k""",
+    """INSERT INTO certificates (profile_id, name, institution, date)
+       SELECT p.id, 'Certificado', 'Institución', date '2020-01-01' FROM explain_profiles p""",
+    """INSERT INTO skills (profile_id, name, type)
+       SELECT p.id, 'skill_' || k, 'tech' FROM explain_profiles p CROSS JOIN generate_series(1, 2) k""",
+    """INSERT INTO skill_categories (profile_id, skill_type_id, skills)
+       SELECT p.id, t, '["python", "sql"]'::jsonb FROM explain_profiles p CROSS JOIN generate_series(1, 2) t""",
+    """INSERT INTO resumes (user_id, title, status, created_at, updated_at)
+       SELECT u.id, 'CV ' || k, 'active', now(), now() FROM explain_users u CROSS JOIN generate_series(1, 2) k""",
+    """INSERT INTO job_applications (user_id, resume_id, company, position, status, match_percentage, created_at, updated_at)
+       SELECT r.user_id, r.id, 'Empresa', 'Cargo', 'applied', 50, now(), now()
+       FROM resumes r JOIN explain_users u ON u.id = r.user_id""",
+    """INSERT INTO cv_analyses (user_id, resume_id, version, ai_data, created_at)
+       SELECT r.user_id, r.id, 1, '{{}}'::jsonb, now() FROM resumes r JOIN explain_users u ON u.id = r.user_id""",
+    """INSERT INTO postulaciones (usuario_id, nombre_cargo, empresa, estado)
+       SELECT u.id, 'Cargo ' || k, 'Empresa', 'En Progreso' FROM explain_users u CROSS JOIN generate_series(1, 3) k""",
+    """INSERT INTO standard_skills (normalized_name, display_name, skill_type_id)
+       SELECT 'seedskill_' || g, 'Seed skill ' || g, 1 + g % 2 FROM generate_series(1, :rows) g""",
+    """INSERT INTO application_stats (user_id, kind, dimension, value, count, match_sum, match_count)
+       SELECT u.id, 'postulacion', 'estado', 'En Progreso', 3, 0, 0 FROM explain_users u""",
+    """INSERT INTO job_postings (content_hash, title, description, created_at)
+       SELECT md5('seed' || g) || md5('posting' || g), 'Cargo ' || g, 'Descripción del puesto ' || g, now()
+       FROM generate_series(1, :rows) g""",
+    """CREATE TEMP TABLE explain_skills ON COMMIT DROP AS
+       SELECT id, row_number() OVER (ORDER BY id) AS n FROM standard_skills WHERE normalized_name LIKE 'seedskill%'""",
+    # Cinco habilidades por perfil repartidas entre 500 del catálogo; la primera sigue en uso (trabajo actual)
+    """INSERT INTO profile_skill_experience (profile_id, standard_skill_id, total_months, last_used, is_current,
+                                           months_anchor, updated_at)
+       SELECT p.id, s.id, (p.id + k * 17) % 120, date '2020-01-01' + k * 30, k = 1,
+              CASE WHEN k = 1 THEN CAST(date '2015-01-01' + (p.id % 96) * interval '1 month' AS date) END, now()
+       FROM explain_profiles p CROSS JOIN generate_series(1, 5) k JOIN explain_skills s ON s.n = 1 + (p.id * 5 + k) % 500""",
+]
+
+
+def seed(connection, rows):
+    for statement in SEED_STATEMENTS:
+        connection.execute(text(statement.format(domain=SEED_DOMAIN)), {'rows': rows})
+    connection.execute(text('ANALYZE'))
+
+
+# Índices que el plan de la consulta debe usar (además de no tener Seq Scan sobre tablas grandes)
+REQUIRED_INDEXES = {
+    'candidatos por experiencia': ('ix_profile_skill_experience_skill_months', 'ix_profile_skill_experience_skill_anchor'),
+}
+
+
+def route_queries(user_id, profile_id, resume_id, skill_name, skill_id):
+    """
+    Consultas que emiten las rutas, con los mismos filtros, para un usuario de los datos sintéticos.
+    """
+    cache = get_reference_cache()
+    return [
+        ('login', select(User).where(User.email == f'seed1{SEED_DOMAIN}').limit(1)),
+        ('profile por user_id', select(Profile).where(Profile.user_id == user_id).limit(1)),
+        ('get_cvs', select(Resume).where(Resume.user_id == user_id)),
+        ('update_cv', select(Resume).where(Resume.id == resume_id, Resume.user_id == user_id).limit(1)),
+        ('get_applications', select(Postulacion).where(Postulacion.usuario_id == user_id)),
+        ('update_application', select(Postulacion).where(Postulacion.id == 1, Postulacion.usuario_id == user_id).limit(1)),
+        ('work_experiences', select(WorkExperience).where(WorkExperience.profile_id.in_([profile_id]))),
+        ('educations', select(Education).where(Education.profile_id.in_([profile_id]))),
+        ('languages', select(Language).where(Language.profile_id.in_([profile_id]))),
+        ('certificates', select(Certificate).where(Certificate.profile_id.in_([profile_id]))),
+        ('skills', select(Skill).where(Skill.profile_id.in_([profile_id]))),
+        ('skill_categories por tipo', select(SkillCategory).where(
+            SkillCategory.profile_id == profile_id, SkillCategory.skill_type_id == cache.skill_type_id('tech')).limit(1)),
+        ('skill_categories por perfil', select(SkillCategory).where(SkillCategory.profile_id.in_([profile_id]))),
+        ('search_skills', select(StandardSkill).where(
+            StandardSkill.normalized_name.ilike(f'%{skill_name}%'),
+            StandardSkill.skill_type_id == cache.skill_type_id('soft'),
+            ~StandardSkill.normalized_name.in_(['python', 'sql'])
+        ).limit(10)),
+        ('job_applications', select(JobApplication).where(JobApplication.user_id == user_id)),
+        ('job_applications por resume', select(JobApplication).where(JobApplication.resume_id == resume_id)),
+        ('cv_analyses por resume', select(func.max(CvAnalysis.version)).where(CvAnalysis.resume_id == resume_id)),
+        ('export_cv_analysis', select(CvAnalysis).where(CvAnalysis.id == 1, CvAnalysis.user_id == user_id).limit(1)),
+        ('application_stats', select(ApplicationStat).where(ApplicationStat.user_id == user_id, ApplicationStat.count > 0)),
+        ('job_postings por hash', select(JobPosting).where(JobPosting.content_hash == '0' * 64).limit(1)),
+        ('candidatos por experiencia', experience_query([skill_id], min_months=36)),
+    ]
+
+
+def _nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from _nodes(child)
+
+
+def run_explain_check(rows=20000, min_table_rows=1000):
+    """
+    Siembra datos, ejecuta EXPLAIN sobre las consultas de cada ruta y devuelve
+    [(ruta, [tablas grandes recorridas con Seq Scan], [índices de REQUIRED_INDEXES que el plan no usa])].
+    Revierte todo al terminar.
+    Conviene ejecutarlo contra una base de datos descartable: la siembra toma bloqueos sobre las tablas.
+    """
+    results = []
+    with db.engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            seed(connection, rows)
+            large_tables = {name for name, tuples in connection.execute(text(
+                "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+            )) if tuples >= min_table_rows}
+
+            user_id, profile_id = connection.execute(text(
+                'SELECT user_id, id FROM explain_profiles ORDER BY id OFFSET :offset LIMIT 1'
+            ), {'offset': rows // 2}).one()
+            resume_id = connection.execute(select(Resume.id).where(Resume.user_id == user_id).limit(1)).scalar()
+            skill_id = connection.execute(text('SELECT id FROM explain_skills WHERE n = 1')).scalar()
+
+            queries = route_queries(user_id, profile_id, resume_id, f'seedskill_{rows // 2}', skill_id)
+            for name, statement in queries:
+                compiled = statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True})
+                plan = connection.execute(text(f'EXPLAIN (FORMAT JSON) {compiled}')).scalar()
+                nodes = list(_nodes(plan[0]['Plan']))
+                scans = sorted({node.get('Relation Name') for node in nodes
+                                if node.get('Node Type') == 'Seq Scan' and node.get('Relation Name') in large_tables})
+                used = {node.get('Index Name') for node in nodes}
+                missing = [index for index in REQUIRED_INDEXES.get(name, ()) if index not in used]
+                results.append((name, scans, missing))
+        finally:
+            transaction.rollback()
+            # reltuples/relpages se actualizan en el lugar y no se revierten: se recalculan con los datos reales
+            # para no dejar al planificador con las estadísticas de la siembra
+            connection.execute(text('ANALYZE'))
+            connection.commit()
+    return results
@@ -0,0 +1,178 @@
+import io
+import json
+import subprocess
+from flask import current_app, render_template
+from app.resilience import DeadlineExceeded
+from app.tracing import tracer
+
+_pdfkit_config = None
+
+# Orden y títulos de las secciones del CV adaptado
+CV_SECTIONS = [
+    ('resumen', 'RESUMEN PROFESIONAL'),
+    ('experiencia_laboral', 'EXPERIENCIA LABORAL'),
+    ('educacion', 'EDUCACIÓN'),
+    ('idiomas', 'IDIOMAS'),
+    ('certificaciones', 'CERTIFICACIONES'),
+    ('habilidades', 'HABILIDADES'),
+]
+
+
+class ExportError(Exception):
+    pass
+
+
+def _flatten(value, indent=''):
+    """
+    Convierte los valores del CV adaptado (texto, listas o diccionarios) en líneas de texto plano.
+    """
+    if value is None:
+        return []
+    if isinstance(value, dict):
+        lines = []
+        for key, item in value.items():
+            nested = _flatten(item, indent + '  ')
+            if len(nested) == 1:
+                lines.append(f"{indent}{key.replace('_', ' ').capitalize()}: {nested[0].strip()}")
+            elif nested:
+                lines.append(f"{indent}{key.replace('_', ' ').capitalize()}:")
+                lines.extend(nested)
+        return lines
+    if isinstance(value, (list, tuple)):
+        lines = []
+        for item in value:
+            nested = _flatten(item, indent + '  ')
+            if nested:
+                lines.append(f"{indent}- {nested[0].strip()}")
+                lines.extend(nested[1:])
+        return lines
+    return [f"{indent}{line}" for line in str(value).splitlines() if line.strip()]
+
+
+def get_pdfkit_config():
+    """
+    Importa pdfkit y ubica wkhtmltopdf recién cuando se genera el primer PDF.
+    """
+    global _pdfkit_config
+    if _pdfkit_config is None:
+        import pdfkit
+        _pdfkit_config = pdfkit.configuration(wkhtmltopdf=current_app.config['WKHTMLTOPDF_PATH'])
+    return _pdfkit_config
+
+
+def render_html(analysis):
+    with tracer.span('cv.render_template', template='cv_template.html'):
+        return render_template(
+            'cv_template.html',
+            job_title=analysis.job_title,
+            ai_data=analysis.ai_data,
+            profile_data=analysis.profile_data
+        )
+
+
+def html_to_pdf(html, timeout=None):
+    """
+    Convierte HTML a PDF con wkhtmltopdf. A diferencia de pdfkit.from_string, el proceso se
+    termina si supera `timeout` segundos.
+    """
+    import pdfkit
+    command = pdfkit.PDFKit(html, 'string', configuration=get_pdfkit_config()).command()
+    with tracer.span('pdf.convert', **{'html.chars': len(html)}) as span:
+        try:
+            result = subprocess.run(command, input=html.encode('utf-8'), capture_output=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise DeadlineExceeded('pdf')
+        if not result.stdout:
+            raise IOError(f"wkhtmltopdf falló: {result.stderr.decode('utf-8', 'replace')}")
+        span.set_attribute('pdf.bytes', len(result.stdout))
+        return result.stdout
+
+
+def export_pdf(analysis, timeout=None):
+    return html_to_pdf(render_html(analysis), timeout=timeout)
+
+
+def export_basic_pdf(job_title, profile_data, timeout=None):
+    """
+    CV sin IA armado directamente con los datos del perfil (modo degradado de generate_cv).
+    """
+    with tracer.span('cv.render_template', template='cv_basic_template.html'):
+        html = render_template('cv_basic_template.html', job_title=job_title, profile_data=profile_data)
+    return html_to_pdf(html, timeout=timeout)
+
+
+def export_txt(analysis):
+    """
+    Genera el CV adaptado en texto plano, sin formato, pensado para sistemas ATS.
+    """
+    cv = (analysis.ai_data or {}).get('cv_adaptado', {})
+    lines = [str(cv.get('nombre', '')).upper()]
+    if analysis.job_title:
+        lines.append(analysis.job_title)
+    lines.extend(_flatten(cv.get('contacto')))
+
+    for key, title in CV_SECTIONS:
+        content = _flatten(cv.get(key))
+        if content:
+            lines.extend(['', title])
+            lines.extend(content)
+
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def export_json(analysis):
+    return json.dumps({
+        'id': analysis.id,
+        'resume_id': analysis.resume_id,
+        'job_application_id': analysis.job_application_id,
+        'version': analysis.version,
+        'job_title': analysis.job_title,
+        'created_at': analysis.created_at.isoformat() if analysis.created_at else None,
+        'ai_data': analysis.ai_data
+    }, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def export_docx(analysis):
+    try:
+        import docx  # Dependencia opcional (python-docx)
+    except ImportError:
+        raise ExportError('La exportación a DOCX requiere el paquete python-docx')
+
+    cv = (analysis.ai_data or {}).get('cv_adaptado', {})
+    document = docx.Document()
+    document.add_heading(str(cv.get('nombre', '')), level=0)
+    if analysis.job_title:
+        document.add_paragraph(analysis.job_title)
+    for line in _flatten(cv.get('contacto')):
+        document.add_paragraph(line.strip())
+
+    for key, title in CV_SECTIONS:
+        content = _flatten(cv.get(key))
+        if content:
+            document.add_heading(title.capitalize(), level=1)
+            for line in content:
+                document.add_paragraph(line.strip())
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+# formato -> (función, mimetype)
+EXPORTERS = {
+    'pdf': (export_pdf, 'application/pdf'),
+    'txt': (export_txt, 'text/plain; charset=utf-8'),
+    'json': (export_json, 'application/json'),
+    'docx': (export_docx, 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+}
+
+
+def export_analysis(analysis, fmt):
+    """
+    Regenera el CV en el formato pedido a partir del análisis guardado, sin volver a llamar a la IA.
+    Devuelve una tupla (contenido, mimetype).
+    """
+    if fmt not in EXPORTERS:
+        raise ExportError(f'Formato no soportado: {fmt}')
+    exporter, mimetype = EXPORTERS[fmt]
+    return exporter(analysis), mimetype
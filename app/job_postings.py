@@ -0,0 +1,291 @@
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, or_
+from sqlalchemy.dialects.postgresql import insert
+from app import db
+from app.models import JobPosting
+from app.nlp_utils import parse_job_posting
+from app.resilience import Deadline
+from app.utils import normalize_skill_name
+
+# Subir al cambiar el prompt o el formato de los requisitos: los puestos ya analizados se vuelven a analizar
+PARSER_VERSION = 1
+
+DEFAULT_IMPORTANCE = 3
+# Peso extra de las habilidades obligatorias en el puntaje local
+REQUIRED_BONUS = 2
+# Parte del puntaje local que corresponde a los años de experiencia pedidos
+EXPERIENCE_WEIGHT = 0.2
+
+# Un solo hilo: los puestos se analizan de a uno, sin competir con las peticiones interactivas por la cuota
+_parser = ThreadPoolExecutor(max_workers=1, thread_name_prefix='job-posting-parser')
+_pending = set()  # content_hash de los puestos ya programados
+_pending_lock = threading.Lock()
+
+# Espera máxima entre reintentos de un puesto cuyo análisis falla
+MAX_RETRY_SECONDS = 24 * 3600
+
+
+def content_hash(description):
+    """
+    Hash del texto del puesto sin diferencias de mayúsculas ni espacios, para reconocer la misma oferta.
+    """
+    text = ' '.join(str(description).split()).casefold()
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def get_or_create_job_posting(description, title=None):
+    """
+    Devuelve el JobPosting de la descripción, creándolo sin analizar si no existe. No confirma la transacción.
+    """
+    if not description or not description.strip():
+        return None
+    digest = content_hash(description)
+    db.session.execute(
+        insert(JobPosting.__table__)
+        .values(content_hash=digest, title=title[:200] if title else None, description=description,
+                created_at=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=['content_hash'])
+    )
+    return JobPosting.query.filter_by(content_hash=digest).one()
+
+
+def _as_int(value, default=None):
+    try:
+        return int(str(value).strip().rstrip('%'))
+    except (TypeError, ValueError):
+        return default
+
+
+def normalize_requirements(raw):
+    """
+    Limpia la respuesta de la IA: habilidades con clave normalizada (como standard_skills.normalized_name),
+    importancia entre 1 y 5 y sin duplicados.
+    """
+    skills = {}
+    for item in raw.get('habilidades') or []:
+        if isinstance(item, str):
+            item = {'nombre': item}
+        if not isinstance(item, dict) or not item.get('nombre'):
+            continue
+        key = normalize_skill_name(item['nombre'])
+        if not key:
+            continue
+        skill = {
+            'nombre': str(item['nombre']).strip(),
+            'clave': key,
+            'tipo': 'blanda' if str(item.get('tipo', '')).lower().startswith('bland') else 'tecnica',
+            'importancia': min(max(_as_int(item.get('importancia'), DEFAULT_IMPORTANCE), 1), 5),
+            'obligatoria': bool(item.get('obligatoria')),
+        }
+        previous = skills.get(key)
+        if previous:
+            skill['importancia'] = max(skill['importancia'], previous['importancia'])
+            skill['obligatoria'] = skill['obligatoria'] or previous['obligatoria']
+        skills[key] = skill
+
+    seniority = raw.get('seniority')
+    seniority = str(seniority).strip().lower() if seniority and str(seniority).lower() not in ('null', 'none') else None
+    return {
+        'seniority': seniority and seniority[:30],
+        'anios_experiencia': _as_int(raw.get('anios_experiencia')),
+        'habilidades': sorted(skills.values(), key=lambda s: (-s['importancia'], s['clave'])),
+        'idiomas': [i for i in raw.get('idiomas') or [] if isinstance(i, dict)],
+        'responsabilidades': [str(r) for r in raw.get('responsabilidades') or [] if r],
+    }
+
+
+def needs_parsing(posting):
+    return posting.requirements is None or (posting.parser_version or 0) < PARSER_VERSION
+
+
+def parse_due(posting, now=None):
+    """
+    False mientras dura la espera tras un análisis fallido; la espera se duplica con cada falla consecutiva.
+    """
+    if not posting.parse_failures or posting.parse_failed_at is None:
+        return True
+    delay = min(current_app.config['JOB_POSTING_RETRY_SECONDS'] * 2 ** (posting.parse_failures - 1),
+                MAX_RETRY_SECONDS)
+    return (now or datetime.utcnow()) >= posting.parse_failed_at + timedelta(seconds=delay)
+
+
+def record_parse_result(posting, raw):
+    """
+    Guarda los requisitos de la respuesta de la IA o, si no es un JSON válido, registra la falla.
+    Devuelve False en ese caso.
+    """
+    if not isinstance(raw, dict):
+        posting.parse_failures = (posting.parse_failures or 0) + 1
+        posting.parse_failed_at = datetime.utcnow()
+        return False
+    requirements = normalize_requirements(raw)
+    posting.requirements = requirements
+    posting.seniority = requirements['seniority']
+    posting.parser_version = PARSER_VERSION
+    posting.parsed_at = datetime.utcnow()
+    posting.parse_failures = 0
+    posting.parse_failed_at = None
+    return True
+
+
+def parse_posting(posting, user_id=None, priority='interactive', deadline=None):
+    """
+    Analiza el puesto con la IA y guarda los requisitos. Devuelve False si la IA no respondió un JSON válido.
+    Dos peticiones simultáneas sobre un puesto nuevo pueden analizarlo ambas; gana la última escritura.
+    """
+    raw = parse_job_posting(posting.description, user_id=user_id, priority=priority, deadline=deadline)
+    return record_parse_result(posting, raw)
+
+
+def find_job_posting(description):
+    """Devuelve el JobPosting ya registrado para la descripción, o None. Solo lectura."""
+    if not description or not description.strip():
+        return None
+    return JobPosting.query.filter_by(content_hash=content_hash(description)).first()
+
+
+def schedule_parsing(app, description, title=None):
+    """
+    Programa en segundo plano (prioridad batch) el registro y análisis del puesto, para que las peticiones
+    interactivas no esperen a la IA. Mientras tanto generate-cv usa solo el texto de la descripción.
+    """
+    if not description or not description.strip():
+        return None
+    digest = content_hash(description)
+    with _pending_lock:
+        if digest in _pending:
+            return None
+        _pending.add(digest)
+    return _parser.submit(_run_parsing, app, digest, description, title)
+
+
+def _run_parsing(app, digest, description, title):
+    with app.app_context():
+        try:
+            # El registro se confirma solo: la fila nueva no queda bloqueada mientras responde la IA
+            posting = get_or_create_job_posting(description, title)
+            db.session.commit()
+            if not needs_parsing(posting) or not parse_due(posting):
+                return
+            posting_id = posting.id
+            # La llamada a la IA se hace fuera de toda transacción y sin retener una conexión del pool
+            db.session.close()
+            try:
+                raw = parse_job_posting(description, priority='batch',
+                                        deadline=Deadline(app.config['JOB_POSTING_PARSE_TIMEOUT']))
+            except Exception:
+                app.logger.exception("Error al analizar el puesto %s", digest)
+                raw = None
+            posting = db.session.get(JobPosting, posting_id)
+            if posting is not None:
+                record_parse_result(posting, raw)
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            app.logger.exception("Error al registrar el puesto %s", digest)
+        finally:
+            with _pending_lock:
+                _pending.discard(digest)
+
+
+def pending_postings(limit=None):
+    query = select(JobPosting).where(or_(
+        JobPosting.requirements.is_(None),
+        JobPosting.parser_version.is_(None),
+        JobPosting.parser_version < PARSER_VERSION
+    )).order_by(JobPosting.id)
+    if limit:
+        query = query.limit(limit)
+    return db.session.scalars(query).all()
+
+
+def profile_skill_names(profile):
+    return [skill for category in profile.skill_categories for skill in category.skills or []]
+
+
+def _months_between(start, end):
+    return max(0, (end.year - start.year) * 12 + end.month - start.month)
+
+
+def merged_months(intervals):
+    """
+    Meses cubiertos por los intervalos (inicio, fin), sin contar dos veces los períodos superpuestos.
+    """
+    total = 0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += _months_between(current_start, current_end)
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += _months_between(current_start, current_end)
+    return total
+
+
+def experience_interval(experience, today=None):
+    """
+    (inicio, fin) de una experiencia laboral; los trabajos actuales o sin fecha de fin llegan hasta hoy.
+    """
+    if not experience.start_date:
+        return None
+    end = experience.end_date
+    if experience.current_job or end is None:
+        end = today or date.today()
+    return experience.start_date, max(end, experience.start_date)
+
+
+def experience_months(work_experiences, today=None):
+    intervals = [experience_interval(exp, today) for exp in work_experiences]
+    return merged_months([interval for interval in intervals if interval])
+
+
+def score_dependencies(requirements):
+    """
+    Facetas del perfil de las que depende el puntaje local ('skills', 'experience').
+    """
+    facets = set()
+    if (requirements or {}).get('habilidades'):
+        facets.add('skills')
+        if requirements.get('anios_experiencia'):
+            facets.add('experience')
+    return facets
+
+
+def score_profile(requirements, skills, months=None):
+    """
+    Puntaje local (sin IA) de un perfil contra los requisitos ya analizados: porcentaje del peso de las
+    habilidades pedidas que el candidato declara y, si el puesto pide años de experiencia y se pasan los
+    `months` del candidato, qué parte de ellos cubre. Devuelve None si el puesto no tiene habilidades.
+    """
+    required = (requirements or {}).get('habilidades') or []
+    if not required:
+        return None
+    have = {normalize_skill_name(skill) for skill in skills}
+    total = matched = 0
+    matches, missing = [], []
+    for skill in required:
+        weight = skill['importancia'] + (REQUIRED_BONUS if skill['obligatoria'] else 0)
+        total += weight
+        if skill['clave'] in have:
+            matched += weight
+            matches.append(skill['nombre'])
+        else:
+            missing.append(skill['nombre'])
+    percentage = 100 * matched / total
+
+    years = requirements.get('anios_experiencia')
+    if years and months is not None:
+        coverage = min(1.0, months / (years * 12))
+        percentage = (1 - EXPERIENCE_WEIGHT) * percentage + EXPERIENCE_WEIGHT * 100 * coverage
+    return {
+        'porcentaje': round(percentage),
+        'coincidencias': matches,
+        'faltantes': missing,
+    }
@@ -0,0 +1,255 @@
+import random
+import threading
+import time
+from itertools import count
+from flask import current_app
+from app.resilience import CircuitOpenError, DeadlineExceeded
+
+PRIORITIES = {'interactive': 0, 'batch': 1}
+
+# Tokens de salida que se reservan por llamada hasta conocer el uso real
+OUTPUT_TOKENS_ESTIMATE = 2048
+MAX_USER_BUCKETS = 10000
+
+
+class QuotaExceededError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def estimate_tokens(prompt):
+    # Aproximación de ~4 caracteres por token más la respuesta esperada
+    return len(prompt) // 4 + OUTPUT_TOKENS_ESTIMATE
+
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Segundos hasta que haya `amount` disponible (0 si ya lo hay)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta):
+        # Devuelve o cobra la diferencia entre lo estimado y lo realmente usado (puede quedar en negativo)
+        self.tokens = min(self.capacity, self.tokens + delta)
+
+    def is_full(self, now):
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class _Ticket:
+    def __init__(self, seq, user_id, tokens, priority, deadline):
+        self.seq = seq
+        self.user_id = user_id
+        self.tokens = tokens
+        self.priority = priority
+        self.deadline = deadline
+
+    def sort_key(self):
+        return (self.priority, self.seq)
+
+
+class GeminiScheduler:
+    """
+    Planificador de llamadas salientes a Gemini dentro del proceso.
+
+    Aplica un presupuesto global y otro por usuario (peticiones y tokens por minuto), atiende primero
+    la prioridad interactiva, descarta las peticiones cuyo plazo vence en cola y frena todas las
+    llamadas con backoff exponencial cuando el proveedor responde que se superó la cuota.
+    """
+
+    def __init__(self, rpm, tpm, user_rpm, user_tpm, max_backoff=60.0):
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._seq = count()
+        self._requests = TokenBucket(rpm)
+        self._tokens = TokenBucket(tpm)
+        self._user_limits = (user_rpm, user_tpm)
+        self._user_buckets = {}
+        self._blocked_until = 0.0
+        self._backoff = 0.0
+        self._max_backoff = max_backoff
+
+    def _buckets_for(self, user_id):
+        if user_id not in self._user_buckets:
+            if len(self._user_buckets) >= MAX_USER_BUCKETS:
+                now = time.monotonic()
+                waiting_users = {t.user_id for t in self._waiting}
+                self._user_buckets = {
+                    uid: buckets for uid, buckets in self._user_buckets.items()
+                    if uid in waiting_users or not all(b.is_full(now) for b in buckets)
+                }
+            self._user_buckets[user_id] = (TokenBucket(self._user_limits[0]), TokenBucket(self._user_limits[1]))
+        return self._user_buckets[user_id]
+
+    def _select(self, now):
+        """
+        Elige la siguiente petición a despachar. Devuelve (ticket, espera): si ninguna puede salir
+        aún, ticket es None y espera indica cuándo volver a intentar.
+        """
+        global_wait = max(self._blocked_until - now, 0.0)
+        min_wait = None
+        for ticket in sorted(self._waiting, key=_Ticket.sort_key):
+            wait = max(global_wait, self._requests.wait_time(1, now), self._tokens.wait_time(ticket.tokens, now))
+            if wait > 0:
+                # La cuota global se respeta en orden de prioridad: nadie se adelanta a esta petición
+                return None, wait if min_wait is None else min(wait, min_wait)
+            if ticket.user_id is not None:
+                user_requests, user_tokens = self._buckets_for(ticket.user_id)
+                wait = max(user_requests.wait_time(1, now), user_tokens.wait_time(ticket.tokens, now))
+                if wait > 0:
+                    # Solo el presupuesto de este usuario está agotado; se evalúa la siguiente petición
+                    min_wait = wait if min_wait is None else min(wait, min_wait)
+                    continue
+            return ticket, 0.0
+        return None, min_wait
+
+    def acquire(self, user_id, tokens, priority, deadline):
+        with self._cond:
+            ticket = _Ticket(next(self._seq), user_id, tokens, priority, deadline)
+            self._waiting.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    chosen, wait = self._select(now)
+                    if chosen is ticket:
+                        self._requests.consume(1)
+                        self._tokens.consume(tokens)
+                        if user_id is not None:
+                            user_requests, user_tokens = self._buckets_for(user_id)
+                            user_requests.consume(1)
+                            user_tokens.consume(tokens)
+                        return ticket
+                    if now >= deadline:
+                        raise QuotaExceededError('Se superó la cuota de la IA', retry_after=wait)
+                    timeout = deadline - now
+                    if wait:
+                        timeout = min(timeout, wait)
+                    self._cond.wait(timeout=timeout)
+            finally:
+                self._waiting.remove(ticket)
+                self._cond.notify_all()
+
+    def release(self, ticket, used_tokens):
+        if used_tokens is None:
+            return
+        with self._cond:
+            delta = ticket.tokens - used_tokens
+            self._tokens.adjust(delta)
+            if ticket.user_id is not None:
+                self._buckets_for(ticket.user_id)[1].adjust(delta)
+            self._cond.notify_all()
+
+    def report_throttled(self, retry_after=None):
+        with self._cond:
+            self._backoff = min(self._max_backoff, self._backoff * 2 if self._backoff else 1.0)
+            delay = retry_after if retry_after else self._backoff * (0.5 + random.random())
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+
+    def report_success(self):
+        with self._cond:
+            self._backoff = 0.0
+
+    def call(self, fn, user_id=None, tokens=OUTPUT_TOKENS_ESTIMATE, priority='interactive', timeout=30.0):
+        """
+        Ejecuta fn() cuando el presupuesto lo permite. Reintenta dentro del plazo si el proveedor limita
+        la tasa y lanza QuotaExceededError si el plazo vence antes de poder despachar la llamada.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            ticket = self.acquire(user_id, tokens, PRIORITIES.get(priority, PRIORITIES['batch']), deadline)
+            # Sin respuesta se cobra lo reservado: una petición enviada (incluida la abandonada por el plazo,
+            # que sigue en curso) consume cuota del proveedor. Solo se devuelve si nunca llegó a enviarse.
+            used = tokens
+            try:
+                result = fn()
+                used = _used_tokens(result, tokens)
+            except Exception as e:
+                if _not_sent(e):
+                    used = 0
+                if not is_throttled(e):
+                    raise
+                self.report_throttled(getattr(e, 'retry_after', None))
+                continue
+            finally:
+                self.release(ticket, used)
+            self.report_success()
+            return result
+
+
+def is_throttled(error):
+    # google.api_core.exceptions.ResourceExhausted / TooManyRequests (HTTP 429)
+    return type(error).__name__ in ('ResourceExhausted', 'TooManyRequests') or getattr(error, 'code', None) == 429
+
+
+def _not_sent(error):
+    # Rechazada por cuota, cortada por el circuito o por el plazo antes de llegar al proveedor
+    if isinstance(error, DeadlineExceeded):
+        return not error.abandoned
+    return is_throttled(error) or isinstance(error, CircuitOpenError)
+
+
+def token_usage(response, estimate):
+    """
+    Tokens de una respuesta de Gemini: {'prompt', 'completion', 'total', 'estimated'}. `estimate` es lo que
+    reservó estimate_tokens(prompt). google-generativeai 0.3.x no expone usage_metadata; sin ese dato la
+    respuesta se estima por su largo (~4 caracteres por token). Devuelve None si no hay texto.
+    """
+    usage = getattr(response, 'usage_metadata', None)
+    if usage and getattr(usage, 'total_token_count', None) is not None:
+        return {
+            'prompt': getattr(usage, 'prompt_token_count', None),
+            'completion': getattr(usage, 'candidates_token_count', None),
+            'total': usage.total_token_count,
+            'estimated': False,
+        }
+    try:
+        text = response.text
+    except (AttributeError, ValueError):
+        # Respuesta bloqueada o sin candidatos
+        return None
+    prompt_tokens = max(estimate - OUTPUT_TOKENS_ESTIMATE, 0)
+    completion_tokens = len(text) // 4
+    return {'prompt': prompt_tokens, 'completion': completion_tokens,
+            'total': prompt_tokens + completion_tokens, 'estimated': True}
+
+
+def _used_tokens(response, estimate):
+    usage = token_usage(response, estimate)
+    return usage['total'] if usage else None
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                config = current_app.config
+                _scheduler = GeminiScheduler(
+                    rpm=config['GEMINI_RPM'],
+                    tpm=config['GEMINI_TPM'],
+                    user_rpm=config['GEMINI_USER_RPM'],
+                    user_tpm=config['GEMINI_USER_TPM']
+                )
+    return _scheduler
@@ -16,12 +16,13 @@ class User(db.Model):
     email_notifications = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    deletion_requested_at = db.Column(db.DateTime)  # Cuenta en proceso de borrado (ver app/account_purge.py)
 
     # Relaciones
-    profile = db.relationship("Profile", back_populates="user", uselist=False)
-    resumes = db.relationship("Resume", back_populates="user", cascade="all, delete-orphan")
-    postulaciones = db.relationship("Postulacion", backref="usuario")
-    job_applications = db.relationship("JobApplication", back_populates="user", cascade="all, delete-orphan")
+    profile = db.relationship("Profile", back_populates="user", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    resumes = db.relationship("Resume", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    postulaciones = db.relationship("Postulacion", backref="usuario", cascade="all, delete-orphan", passive_deletes=True)
+    job_applications = db.relationship("JobApplication", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<User {self.email}>"
@@ -30,7 +31,7 @@ class Profile(db.Model):
     __tablename__ = 'profiles'
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), unique=True, nullable=False)
     linkedin_url = db.Column(db.Text)
     github_url = db.Column(db.Text)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -42,12 +43,12 @@ class Profile(db.Model):
     user = db.relationship("User", back_populates="profile")
 
     # Relaciones con WorkExperience, Education, Language, Skill, Certificate
-    work_experiences = db.relationship("WorkExperience", back_populates="profile", cascade="all, delete-orphan")
-    educations = db.relationship("Education", back_populates="profile", cascade="all, delete-orphan")
-    languages = db.relationship("Language", back_populates="profile", cascade="all, delete-orphan")
-    skill_categories = db.relationship("SkillCategory", back_populates="profile", cascade="all, delete-orphan")
-    certificates = db.relationship("Certificate", back_populates="profile", cascade="all, delete-orphan")
-    skills = db.relationship("Skill", back_populates="profile", cascade="all, delete-orphan")
+    work_experiences = db.relationship("WorkExperience", back_populates="profile", cascade="all, delete-orphan", passive_deletes=True)
+    educations = db.relationship("Education", back_populates="profile", cascade="all, delete-orphan", passive_deletes=True)
+    languages = db.relationship("Language", back_populates="profile", cascade="all, delete-orphan", passive_deletes=True)
+    skill_categories = db.relationship("SkillCategory", back_populates="profile", cascade="all, delete-orphan", passive_deletes=True)
+    certificates = db.relationship("Certificate", back_populates="profile", cascade="all, delete-orphan", passive_deletes=True)
+    skills = db.relationship("Skill", back_populates="profile", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<Profile {self.id}>"
@@ -56,13 +57,14 @@ class WorkExperience(db.Model):
     __tablename__ = 'work_experience'
 
     id = db.Column(db.Integer, primary_key=True)
-    profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id'), nullable=False)
+    profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id', ondelete='CASCADE'), nullable=False, index=True)
     company = db.Column(db.String(100), nullable=False)
     position = db.Column(db.String(100), nullable=False)
     start_date = db.Column(db.Date, nullable=False)
     end_date = db.Column(db.Date, nullable=True)
     description = db.Column(db.Text)
     current_job = db.Column(db.Boolean, default=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relación con el modelo Profile
     profile = db.relationship("Profile", back_populates="work_experiences")
@@ -74,12 +76,13 @@ class Education(db.Model):
     __tablename__ = 'education'
 
     id = db.Column(db.Integer, primary_key=True)
-    profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id'), nullable=False)
+    profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id', ondelete='CASCADE'), nullable=False, index=True)
     institution = db.Column(db.String(100), nullable=False)
     degree = db.Column(db.String(100), nullable=False)
     start_date = db.Column(db.Date, nullable=False)
     end_date = db.Column(db.Date)
     description = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relación con el modelo Profile
     profile = db.relationship("Profile", back_populates="educations")
@@ -91,9 +94,10 @@ class Language(db.Model):
     __tablename__ = 'languages'
 
     id = db.Column(db.Integer, primary_key=True)
-    profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id'), nullable=False)
+    profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id', ondelete='CASCADE'), nullable=False, index=True)
     language = db.Column(db.String(50), nullable=False)
     level = db.Column(db.String(20), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relación con el modelo Profile
     profile = db.relationship("Profile", back_populates="languages")
@@ -105,7 +109,7 @@ class Skill(db.Model):
     __tablename__ = 'skills'
 
     id = db.Column(db.Integer, primary_key=True)
-    profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id'), nullable=False)
+    profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id', ondelete='CASCADE'), nullable=False, index=True)
     name = db.Column(db.String(100), nullable=False)
     type = db.Column(db.String(20), nullable=False)
 
@@ -119,7 +123,7 @@ class Resume(db.Model):
     __tablename__ = 'resumes'
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     category = db.Column(db.String(50))
@@ -132,7 +136,10 @@ class Resume(db.Model):
     user = db.relationship("User", back_populates="resumes")
 
     # Relación con el modelo JobApplication
-    job_applications = db.relationship("JobApplication", back_populates="resume", cascade="all, delete-orphan")
+    job_applications = db.relationship("JobApplication", back_populates="resume", cascade="all, delete-orphan", passive_deletes=True)
+
+    # Versiones de análisis de IA generadas para este CV
+    analyses = db.relationship("CvAnalysis", back_populates="resume", cascade="all, delete-orphan", passive_deletes=True, order_by="CvAnalysis.version")
 
     def __repr__(self):
         return f"<Resume {self.title}>"
@@ -141,12 +148,16 @@ class Postulacion(db.Model):
     __tablename__ = 'postulaciones'
 
     id = db.Column(db.Integer, primary_key=True)
-    usuario_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
     nombre_cargo = db.Column(db.String(200), nullable=False)
     empresa = db.Column(db.String(200))
     link = db.Column(db.String(500))
     descripcion = db.Column(db.Text)
     estado = db.Column(db.String(50), default="En Progreso")
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    job_posting_id = db.Column(db.Integer, db.ForeignKey('job_postings.id', ondelete='SET NULL'), index=True)
+
+    job_posting = db.relationship("JobPosting")
 
     def __repr__(self):
         return f"<Postulacion {self.nombre_cargo} at {self.empresa}>"
@@ -155,8 +166,8 @@ class JobApplication(db.Model):
     __tablename__ = 'job_applications'
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id', ondelete='CASCADE'), nullable=False, index=True)
     company = db.Column(db.String(100), nullable=False)
     position = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
@@ -167,6 +178,11 @@ class JobApplication(db.Model):
     match_percentage = db.Column(db.Integer)
     application_deadline = db.Column(db.Date)
     source = db.Column(db.String(50))
+    job_posting_id = db.Column(db.Integer, db.ForeignKey('job_postings.id', ondelete='SET NULL'), index=True)
+    # Puntaje local (sin IA) contra los requisitos del puesto; match_percentage guarda solo el de la IA
+    local_match_percentage = db.Column(db.Integer)
+    # Huellas de las facetas del perfil usadas para calcular local_match_percentage (ver app/rescoring.py)
+    score_facets = db.Column(JSONB)
 
     # Relación con el modelo User
     user = db.relationship("User", back_populates="job_applications")
@@ -174,6 +190,12 @@ class JobApplication(db.Model):
     # Relación con el modelo Resume
     resume = db.relationship("Resume", back_populates="job_applications")
 
+    # Análisis de IA asociados a esta postulación
+    analyses = db.relationship("CvAnalysis", back_populates="job_application", passive_deletes=True)
+
+    # Requisitos estructurados de la descripción del puesto
+    job_posting = db.relationship("JobPosting")
+
     def __repr__(self):
         return f"<JobApplication {self.position} at {self.company}>"
 
@@ -181,11 +203,12 @@ class Certificate(db.Model):
     __tablename__ = 'certificates'
 
     id = db.Column(db.Integer, primary_key=True)
-    profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id'), nullable=False)
+    profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id', ondelete='CASCADE'), nullable=False, index=True)
     name = db.Column(db.String(100), nullable=False)
     institution = db.Column(db.String(100), nullable=False)
     date = db.Column(db.Date)
     url = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relación con el modelo Profile
     profile = db.relationship("Profile", back_populates="certificates")
@@ -200,19 +223,181 @@ class SkillType(db.Model):
 
 class SkillCategory(db.Model):
     __tablename__ = 'skill_categories'
+    # Una categoría por perfil y tipo; también sirve para buscar por profile_id
+    __table_args__ = (db.Index('ix_skill_categories_profile_skill_type', 'profile_id', 'skill_type_id', unique=True),)
     id = db.Column(db.Integer, primary_key=True)
-    profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id'), nullable=False)
+    profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id', ondelete='CASCADE'), nullable=False)
     skill_type_id = db.Column(db.Integer, db.ForeignKey('skill_types.id'), nullable=False)
     skills = db.Column(JSONB)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     profile = db.relationship("Profile", back_populates="skill_categories")
     skill_type = db.relationship("SkillType")
 
 class StandardSkill(db.Model):
     __tablename__ = 'standard_skills'
+    # Índice de trigramas para las búsquedas ILIKE '%texto%' de search_skills
+    __table_args__ = (db.Index('ix_standard_skills_normalized_name_trgm', 'normalized_name',
+                               postgresql_using='gin', postgresql_ops={'normalized_name': 'gin_trgm_ops'}),)
     id = db.Column(db.Integer, primary_key=True)
     normalized_name = db.Column(db.String(100), unique=True)  # "reactjs"
     display_name = db.Column(db.String(100))  # "React.js"
-    skill_type_id = db.Column(db.Integer, db.ForeignKey('skill_types.id'))
+    skill_type_id = db.Column(db.Integer, db.ForeignKey('skill_types.id'), index=True)
     
-    skill_type = db.relationship("SkillType")
\ No newline at end of file
+    skill_type = db.relationship("SkillType")
+
+class CvAnalysis(db.Model):
+    __tablename__ = 'cv_analyses'
+    __table_args__ = (db.UniqueConstraint('resume_id', 'version'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id', ondelete='CASCADE'), nullable=False)
+    job_application_id = db.Column(db.Integer, db.ForeignKey('job_applications.id', ondelete='SET NULL'), index=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    job_title = db.Column(db.String(200))
+    job_description = db.Column(db.Text)
+    profile_data = db.Column(JSONB)  # Perfil enviado a la IA
+    ai_data = db.Column(JSONB, nullable=False)  # Respuesta de la IA tal cual
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    resume = db.relationship("Resume", back_populates="analyses")
+    job_application = db.relationship("JobApplication", back_populates="analyses")
+
+    def __repr__(self):
+        return f"<CvAnalysis {self.resume_id} v{self.version}>"
+
+class ApplicationStat(db.Model):
+    """
+    Contadores de postulaciones mantenidos de forma incremental (ver app/analytics.py).
+    user_id = 0 guarda los totales globales.
+    """
+    __tablename__ = 'application_stats'
+    __table_args__ = (db.UniqueConstraint('user_id', 'kind', 'dimension', 'value'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False, default=0)
+    kind = db.Column(db.String(20), nullable=False)  # 'postulacion' o 'job_application'
+    dimension = db.Column(db.String(30), nullable=False)  # 'estado', 'status', 'source', 'company', 'match_bucket'
+    value = db.Column(db.String(200), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    match_sum = db.Column(db.Integer, nullable=False, default=0)
+    match_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ApplicationStat {self.kind}.{self.dimension}={self.value}: {self.count}>"
+
+class SyncTombstone(db.Model):
+    """
+    Registro de entidades borradas para el feed de cambios (/api/sync/changes).
+    """
+    __tablename__ = 'sync_tombstones'
+    __table_args__ = (db.Index('ix_sync_tombstones_user_deleted_at', 'user_id', 'deleted_at'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    entity = db.Column(db.String(30), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SyncTombstone {self.entity} {self.entity_id}>"
+
+class JobPosting(db.Model):
+    """
+    Descripción de puesto analizada una sola vez (ver app/job_postings.py). La comparten todas las
+    postulaciones y análisis con el mismo texto, sin importar el usuario.
+    """
+    __tablename__ = 'job_postings'
+
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), nullable=False, unique=True)  # sha256 del texto normalizado
+    title = db.Column(db.String(200))
+    description = db.Column(db.Text, nullable=False)
+    requirements = db.Column(JSONB)  # Requisitos extraídos por la IA; NULL hasta el primer análisis
+    seniority = db.Column(db.String(30))
+    parser_version = db.Column(db.Integer)
+    parsed_at = db.Column(db.DateTime)
+    # Fallas consecutivas del análisis y la última, para espaciar los reintentos (ver parse_due)
+    parse_failures = db.Column(db.Integer, nullable=False, default=0)
+    parse_failed_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<JobPosting {self.title or self.content_hash[:12]}>"
+
+class RescoreQueue(db.Model):
+    """
+    Perfiles con facetas modificadas cuyas postulaciones deben volver a puntuarse (ver app/rescoring.py).
+    """
+    __tablename__ = 'rescore_queue'
+
+    profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id', ondelete='CASCADE'), primary_key=True)
+    facet = db.Column(db.String(30), primary_key=True)  # 'skills' o 'experience'
+    enqueued_at = db.Column(db.DateTime, nullable=False)
+    due_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<RescoreQueue {self.profile_id}.{self.facet}>"
+
+class ProfileSkillExperience(db.Model):
+    """
+    Experiencia por habilidad del catálogo derivada de WorkExperience (ver app/skill_experience.py).
+    Si la habilidad se sigue usando, months_anchor guarda el primer día del mes desde el que se cuentan
+    todos sus meses (el inicio del período en curso menos los meses de los períodos cerrados): los meses a
+    la fecha se calculan al consultar y el filtro "al menos N meses" es un rango sobre esa columna.
+    """
+    __tablename__ = 'profile_skill_experience'
+    __table_args__ = (
+        # Filtros "al menos N años de X" y "usó X desde ..." sobre los períodos cerrados
+        db.Index('ix_profile_skill_experience_skill_months', 'standard_skill_id', 'total_months',
+                 postgresql_where=db.text('months_anchor IS NULL')),
+        db.Index('ix_profile_skill_experience_skill_last_used', 'standard_skill_id', 'last_used',
+                 postgresql_where=db.text('months_anchor IS NULL')),
+        # Mismo filtro para las habilidades en uso: más meses = ancla más antigua
+        db.Index('ix_profile_skill_experience_skill_anchor', 'standard_skill_id', 'months_anchor',
+                 postgresql_where=db.text('months_anchor IS NOT NULL')),
+        # Filtro "usa X en su trabajo actual"
+        db.Index('ix_profile_skill_experience_skill_current', 'standard_skill_id',
+                 postgresql_where=db.text('is_current')),
+    )
+
+    profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id', ondelete='CASCADE'), primary_key=True)
+    standard_skill_id = db.Column(db.Integer, db.ForeignKey('standard_skills.id', ondelete='CASCADE'), primary_key=True)
+    total_months = db.Column(db.Integer, nullable=False, default=0)  # Meses de los períodos cerrados
+    last_used = db.Column(db.Date)
+    is_current = db.Column(db.Boolean, nullable=False, default=False)
+    months_anchor = db.Column(db.Date)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ProfileSkillExperience {self.profile_id}.{self.standard_skill_id}: {self.total_months}>"
+
+class StandardSkillAlias(db.Model):
+    """
+    Variantes de nombre de una habilidad del catálogo ("reactjs" -> React.js), cargadas con flask load-skill-catalog.
+    """
+    __tablename__ = 'standard_skill_aliases'
+
+    id = db.Column(db.Integer, primary_key=True)
+    alias = db.Column(db.String(100), nullable=False, unique=True)  # Normalizado como standard_skills.normalized_name
+    standard_skill_id = db.Column(db.Integer, db.ForeignKey('standard_skills.id', ondelete='CASCADE'), nullable=False, index=True)
+
+    standard_skill = db.relationship("StandardSkill")
+
+    def __repr__(self):
+        return f"<StandardSkillAlias {self.alias}>"
+
+class ReferenceDataVersion(db.Model):
+    """
+    Contador de cambios por conjunto de datos de referencia ('standard_skills', ...), para invalidar
+    las copias en memoria de todos los procesos.
+    """
+    __tablename__ = 'reference_data_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ReferenceDataVersion {self.name} v{self.version}>"
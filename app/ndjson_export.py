@@ -0,0 +1,81 @@
+import json
+import zlib
+from datetime import date, datetime
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from app import db
+from app.models import User, Profile, Postulacion, JobApplication
+
+YIELD_PER = 1000
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f'Tipo no serializable: {type(value).__name__}')
+
+
+def _columns(obj, exclude=()):
+    return {c.key: getattr(obj, c.key) for c in obj.__table__.columns if c.key not in exclude}
+
+
+def _user_row(user):
+    return _columns(user, exclude=('password_hash',))
+
+
+def _profile_row(profile):
+    row = _columns(profile)
+    row['work_experiences'] = [_columns(exp) for exp in profile.work_experiences]
+    row['educations'] = [_columns(edu) for edu in profile.educations]
+    row['languages'] = [_columns(lang) for lang in profile.languages]
+    row['certificates'] = [_columns(cert) for cert in profile.certificates]
+    row['skill_categories'] = [_columns(cat) for cat in profile.skill_categories]
+    row['skills'] = [_columns(skill) for skill in profile.skills]
+    return row
+
+
+# entidad -> (consulta, serializador)
+EXPORTS = {
+    'users': (lambda: select(User).order_by(User.id), _user_row),
+    'profiles': (lambda: select(Profile).options(
+        selectinload(Profile.work_experiences),
+        selectinload(Profile.educations),
+        selectinload(Profile.languages),
+        selectinload(Profile.certificates),
+        selectinload(Profile.skill_categories),
+        selectinload(Profile.skills)
+    ).order_by(Profile.id), _profile_row),
+    'postulaciones': (lambda: select(Postulacion).order_by(Postulacion.id), _columns),
+    'job_applications': (lambda: select(JobApplication).order_by(JobApplication.id), _columns),
+}
+
+
+def iter_ndjson(entity, yield_per=YIELD_PER):
+    """
+    Genera la tabla indicada como JSON Lines usando un cursor del lado del servidor (yield_per).
+    Las colecciones hijas se cargan con selectinload por lote y cada lote se libera de la sesión,
+    así la memoria se mantiene constante sin importar el tamaño de la tabla.
+    """
+    build_query, serialize = EXPORTS[entity]
+    result = db.session.execute(build_query().execution_options(yield_per=yield_per))
+    try:
+        for partition in result.scalars().partitions():
+            yield ''.join(
+                json.dumps(serialize(obj), default=_json_default, ensure_ascii=False) + '\n'
+                for obj in partition
+            ).encode('utf-8')
+            db.session.expunge_all()
+    finally:
+        result.close()
+
+
+def gzip_stream(chunks, level=6):
+    """
+    Comprime en formato gzip un generador de bytes sin acumularlo en memoria.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
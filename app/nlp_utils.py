@@ -1,23 +1,61 @@
-import google.generativeai as genai
 from collections import Counter
+from flask import current_app
+from app.llm_scheduler import get_scheduler, estimate_tokens, token_usage, is_throttled, QuotaExceededError
+from app.resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, call_with_timeout
+from app.tracing import tracer
 import json
 import re
+import threading
 
-genai.configure(api_key="Token")
+_genai = None
+_breaker = None
+_breaker_lock = threading.Lock()
 
-def analyze_profile_job(job_description, profile_data):
+
+def get_genai():
     """
-    Analiza la descripción del puesto y el perfil profesional usando Gemini.
+    Importa y configura el SDK de Gemini en el primer uso, para que arrancar la app
+    (rutas CRUD, CLI) no pague el costo de cargarlo.
     """
-
-    prompt = f"""
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        genai.configure(api_key=current_app.config['GEMINI_API_KEY'])
+        _genai = genai
+    return _genai
+
+
+def get_breaker():
+    global _breaker
+    if _breaker is None:
+        with _breaker_lock:
+            if _breaker is None:
+                config = current_app.config
+                _breaker = CircuitBreaker(
+                    failure_threshold=config['GEMINI_BREAKER_FAILURES'],
+                    window=config['GEMINI_BREAKER_WINDOW'],
+                    slow_call_seconds=config['GEMINI_SLOW_CALL_SECONDS'],
+                    open_seconds=config['GEMINI_BREAKER_OPEN_SECONDS']
+                )
+    return _breaker
+
+
+def _build_prompt(job_description, profile_data, requirements=None):
+    requirements_section = f"""
+    Requisitos del puesto ya extraídos de la descripción (habilidades con su importancia de 1 a 5, seniority y años de experiencia).
+    Úsalos tal cual para evaluar la importancia de cada elemento; no los vuelvas a derivar:
+    ```
+    {json.dumps(requirements, ensure_ascii=False)}
+    ```
+""" if requirements else ""
+    return f"""
     Analiza la siguiente descripción de puesto y perfil profesional.
 
     Descripción del puesto:
     ```
     {job_description}
     ```
-
+{requirements_section}
     Perfil profesional:
     ```
     {profile_data}
@@ -85,25 +123,124 @@ Devuelve **un JSON válido** con la siguiente estructura:
     Asegúrate de que el JSON sea válido y esté bien formateado.
     """
 
+
+def _build_requirements_prompt(job_description):
+    return f"""
+    Analiza la siguiente descripción de puesto y extrae sus requisitos.
+
+    Descripción del puesto:
+    ```
+    {job_description}
+    ```
+
+Incluye solo lo que la descripción menciona de forma explícita; no inventes requisitos.
+Para cada habilidad indica su importancia de 1 (deseable) a 5 (imprescindible) y si es obligatoria.
+
+Devuelve **un JSON válido** con la siguiente estructura:
+
+    ```json
+    {{
+      "seniority": "trainee | junior | semi-senior | senior | lead | head, o null si no se indica",
+      "anios_experiencia": 0,
+      "habilidades": [
+        {{"nombre": "Python", "tipo": "tecnica", "importancia": 5, "obligatoria": true}},
+        {{"nombre": "Trabajo en equipo", "tipo": "blanda", "importancia": 3, "obligatoria": false}}
+      ],
+      "idiomas": [{{"idioma": "Inglés", "nivel": "Avanzado"}}],
+      "responsabilidades": ["Responsabilidad principal del puesto"]
+    }}
+    ```
+    Asegúrate de que el JSON sea válido y esté bien formateado.
+    """
+
+
+def _generate_json(prompt, user_id=None, priority='interactive', deadline=None):
+    """
+    Envía el prompt a Gemini a través del circuito y del planificador de cuota y extrae el JSON de la respuesta.
+    Devuelve None si la IA falla o no responde un JSON válido.
+    """
+    breaker = get_breaker()
+    breaker.check()
+
     try:
-        model = genai.GenerativeModel("gemini-pro")
-        response = model.generate_content(prompt)
+        model = get_genai().GenerativeModel("gemini-pro")
+        timeout = current_app.config['GEMINI_INTERACTIVE_TIMEOUT'] if priority == 'interactive' else current_app.config['GEMINI_BATCH_TIMEOUT']
+        if deadline:
+            deadline.check('llm')
+            timeout = min(timeout, deadline.remaining())
+
+        def generate():
+            # El plazo se recalcula en cada intento: la espera en cola también lo consume.
+            # google-generativeai 0.3.x no acepta un timeout por petición, así que se espera la respuesta
+            # en un hilo aparte como máximo el tiempo restante.
+            if not deadline:
+                return breaker.call(lambda: model.generate_content(prompt), ignore=is_throttled)
+            deadline.check('llm')
+            return breaker.call(
+                lambda: call_with_timeout(lambda: model.generate_content(prompt), deadline.remaining(), 'llm'),
+                ignore=is_throttled
+            )
+
+        with tracer.span('llm.generate', **{'llm.model': 'gemini-pro', 'llm.priority': priority}) as span:
+            estimate = estimate_tokens(prompt)
+            response = get_scheduler().call(
+                generate,
+                user_id=user_id,
+                tokens=estimate,
+                priority=priority,
+                timeout=timeout
+            )
+            # Con el SDK 0.3.x los tokens se estiman por el largo del prompt y de la respuesta
+            usage = token_usage(response, estimate)
+            if usage:
+                span.set_attribute('llm.prompt_tokens', usage['prompt'])
+                span.set_attribute('llm.completion_tokens', usage['completion'])
+                span.set_attribute('llm.total_tokens', usage['total'])
+                span.set_attribute('llm.tokens_estimated', usage['estimated'])
 
         # Extraer el JSON de la respuesta de Gemini
-        match = re.search(r'\{.*\}', response.text, re.DOTALL)
-        if match:
+        with tracer.span('llm.extract_json', **{'llm.response_chars': len(response.text)}) as span:
+            match = re.search(r'\{.*\}', response.text, re.DOTALL)
+            if not match:
+                span.add_event('json_not_found')
+                current_app.logger.warning("No se encontró JSON válido en la respuesta de la IA")
+                return None
             json_text = match.group(0)
             try:
                 ai_data = json.loads(json_text)
-                print("✅ Datos de IA extraídos:", ai_data)
-                return ai_data
-            except json.JSONDecodeError:
-                print("❌ Error al decodificar JSON:", json_text)
+            except json.JSONDecodeError as e:
+                span.add_event('json_decode_error', message=str(e))
+                current_app.logger.warning("Error al decodificar el JSON de la IA: %s", e)
                 return None
-        else:
-            print("❌ No se encontró JSON válido en la respuesta de la IA.")
-            return None
+            current_app.logger.debug("Datos de IA extraídos: %s", ai_data)
+            return ai_data
 
+    except (QuotaExceededError, CircuitOpenError, DeadlineExceeded):
+        raise
     except Exception as e:
-        print("❌ Error al comunicarse con la IA:", e)
+        current_app.logger.error("Error al comunicarse con la IA: %s", e)
         return None
+
+
+def parse_job_posting(job_description, user_id=None, priority='interactive', deadline=None):
+    """
+    Extrae con Gemini los requisitos estructurados de una descripción de puesto (ver app/job_postings.py).
+    Lanza las mismas excepciones que analyze_profile_job.
+    """
+    with tracer.span('posting.build_prompt') as span:
+        prompt = _build_requirements_prompt(job_description)
+        span.set_attribute('prompt.chars', len(prompt))
+    return _generate_json(prompt, user_id=user_id, priority=priority, deadline=deadline)
+
+
+def analyze_profile_job(job_description, profile_data, user_id=None, priority='interactive', deadline=None, requirements=None):
+    """
+    Analiza la descripción del puesto y el perfil profesional usando Gemini.
+    Si se pasan los `requirements` ya extraídos del puesto, la IA los usa en lugar de volver a derivarlos.
+    La llamada pasa por el planificador de cuota; si no hay cupo dentro del plazo lanza QuotaExceededError.
+    Con el circuito abierto lanza CircuitOpenError y, si se agota `deadline`, DeadlineExceeded.
+    """
+    with tracer.span('cv.build_prompt', **{'prompt.parsed_requirements': requirements is not None}) as span:
+        prompt = _build_prompt(job_description, profile_data, requirements)
+        span.set_attribute('prompt.chars', len(prompt))
+    return _generate_json(prompt, user_id=user_id, priority=priority, deadline=deadline)
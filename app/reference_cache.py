@@ -0,0 +1,208 @@
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from flask import current_app
+from sqlalchemy import select
+from app import db
+from app.models import SkillType, StandardSkill, StandardSkillAlias, ReferenceDataVersion
+from app.reference_data import reference_data_changed
+from app.skill_catalog import TYPE_NAMES, type_key
+from app.utils import TECH_SKILL_TYPE_ID, SOFT_SKILL_TYPE_ID
+
+# Conjuntos cuya versión invalida la caché. skill_types no tiene contador: solo cambia con migraciones
+# (al desplegar se reinician los procesos) y se recarga junto con el catálogo
+DATASETS = ('standard_skills',)
+
+# Tipo de la API ('tech'/'soft') -> id por convención, solo si skill_types no tiene el nombre esperado
+_FALLBACK_TYPE_IDS = {'tech': TECH_SKILL_TYPE_ID, 'soft': SOFT_SKILL_TYPE_ID}
+
+# Tamaño aproximado de un puntero de lista en CPython
+_POINTER_SIZE = 8
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class _Snapshot:
+    """
+    Copia inmutable de los datos de referencia. El catálogo se guarda en columnas: ids en arreglos
+    compactos y nombres internados, ordenados por nombre para buscarlos con búsqueda binaria.
+    """
+
+    def __init__(self, versions, type_ids, type_names, skills=None, aliases=None, size=0):
+        self.versions = versions
+        self.type_ids = type_ids  # {tipo normalizado o sinónimo: id}
+        self.type_names = type_names  # {id: nombre}
+        self.skills = skills  # (ids, normalized_names) o None si supera el límite de memoria
+        self.aliases = aliases  # (ids, aliases)
+        self.size = size
+
+
+def _find(ids, names, key):
+    i = bisect_left(names, key)
+    if i < len(names) and names[i] == key:
+        return ids[i]
+    return None
+
+
+class ReferenceCache:
+    """
+    Caché en memoria del proceso para skill_types y standard_skills, con un límite estricto de memoria.
+    Cada REFERENCE_CACHE_CHECK_SECONDS compara los contadores de reference_data_versions para que todos
+    los procesos vean los cambios; si el catálogo no entra en el límite se sigue consultando la base de datos.
+    """
+
+    def __init__(self, max_bytes, check_seconds):
+        self.max_bytes = max_bytes
+        self.check_seconds = check_seconds
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.metrics = {'hits': 0, 'misses': 0, 'reloads': 0, 'version_checks': 0, 'over_budget': 0}
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def _count(self, metric):
+        # Contadores aproximados: se aceptan pérdidas entre hilos a cambio de no bloquear
+        self.metrics[metric] += 1
+
+    def _versions(self):
+        rows = db.session.execute(
+            select(ReferenceDataVersion.name, ReferenceDataVersion.version).where(ReferenceDataVersion.name.in_(DATASETS))
+        ).all()
+        return dict(rows)
+
+    def _type_rows(self):
+        return db.session.execute(select(SkillType.id, SkillType.name)).all()
+
+    def _skill_rows(self):
+        # COLLATE "C" ordena por bytes UTF-8, el mismo orden que las comparaciones de str de Python
+        query = select(StandardSkill.id, StandardSkill.normalized_name).order_by(StandardSkill.normalized_name.collate('C'))
+        return db.session.execute(query.execution_options(yield_per=2000))
+
+    def _alias_rows(self):
+        query = select(StandardSkillAlias.standard_skill_id, StandardSkillAlias.alias).order_by(StandardSkillAlias.alias.collate('C'))
+        return db.session.execute(query.execution_options(yield_per=2000))
+
+    def _load(self, versions):
+        type_names = {type_id: sys.intern(name) for type_id, name in self._type_rows() if name}
+        by_key = {type_key(name): type_id for type_id, name in type_names.items()}
+        type_ids = dict(by_key)
+        for synonym, name in TYPE_NAMES.items():
+            if name in by_key:
+                type_ids[synonym] = by_key[name]
+
+        # Se cuenta todo lo que usa el SkillMatcher: los arreglos de ids y las listas de nombres. Cada consulta
+        # se lee y se cierra antes de abrir la siguiente, también si se corta por el límite
+        size = 0
+        columns = []
+        for load_rows in (self._skill_rows, self._alias_rows):
+            ids, names = array('l'), []
+            with load_rows() as rows:
+                for skill_id, name in rows:
+                    if not name:
+                        continue
+                    name = sys.intern(name)
+                    size += ids.itemsize + _POINTER_SIZE + sys.getsizeof(name)
+                    if size > self.max_bytes:
+                        return self._over_budget(versions, type_ids, type_names)
+                    ids.append(skill_id)
+                    names.append(name)
+            columns.append((ids, names))
+
+        skills, aliases = columns
+        return _Snapshot(versions, type_ids, type_names, skills, aliases, size)
+
+    def _over_budget(self, versions, type_ids, type_names):
+        self._count('over_budget')
+        current_app.logger.warning('El catálogo de habilidades supera REFERENCE_CACHE_MAX_BYTES; se consulta la base de datos')
+        return _Snapshot(versions, type_ids, type_names)
+
+    def snapshot(self):
+        """
+        Devuelve la copia vigente, recargándola si no existe o si cambió la versión en la base de datos.
+        """
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - self._checked_at < self.check_seconds:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and now - self._checked_at < self.check_seconds:
+                return snapshot
+            versions = self._versions()
+            self._count('version_checks')
+            self._checked_at = now
+            if snapshot is None or snapshot.versions != versions:
+                snapshot = self._snapshot = self._load(versions)
+                self._count('reloads')
+            return snapshot
+
+    # Tipos de habilidad
+
+    def skill_type_id(self, name):
+        """Id de skill_types para 'tech'/'soft' o el nombre del tipo ('Técnica', 'Blanda')."""
+        type_id = self.snapshot().type_ids.get(type_key(name))
+        if type_id is None:
+            self._count('misses')
+            return _FALLBACK_TYPE_IDS.get(name)
+        self._count('hits')
+        return type_id
+
+    def skill_type_name(self, type_id):
+        self._count('hits')
+        return self.snapshot().type_names.get(type_id)
+
+    # Catálogo de habilidades
+
+    def lookup_skills(self, keys):
+        """
+        {clave: standard_skill_id} para las claves que son un normalized_name o un alias del catálogo
+        (un nombre principal tiene prioridad sobre un alias igual), o None si el catálogo no está en memoria.
+        """
+        snapshot = self.snapshot()
+        if snapshot.skills is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        found = {}
+        for key in keys:
+            skill_id = _find(*snapshot.skills, key)
+            if skill_id is None:
+                skill_id = _find(*snapshot.aliases, key)
+            if skill_id is not None:
+                found[key] = skill_id
+        return found
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            **self.metrics,
+            'bytes': snapshot.size if snapshot else 0,
+            'max_bytes': self.max_bytes,
+            'skills_cached': bool(snapshot and snapshot.skills is not None),
+            'skills': len(snapshot.skills[0]) if snapshot and snapshot.skills else 0,
+            'versions': snapshot.versions if snapshot else {},
+        }
+
+
+def get_reference_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = current_app.config
+                _cache = ReferenceCache(
+                    max_bytes=config['REFERENCE_CACHE_MAX_BYTES'],
+                    check_seconds=config['REFERENCE_CACHE_CHECK_SECONDS']
+                )
+    return _cache
+
+
+@reference_data_changed.connect
+def _on_reference_data_changed(sender, **kwargs):
+    if _cache is not None:
+        _cache.invalidate()
@@ -0,0 +1,28 @@
+from datetime import datetime
+from blinker import Namespace
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from app import db
+from app.models import ReferenceDataVersion
+
+_signals = Namespace()
+
+# Se emite en este proceso después de confirmar un cambio; sender es el nombre del conjunto ('standard_skills')
+reference_data_changed = _signals.signal('reference-data-changed')
+
+
+def bump_version(name):
+    """
+    Incrementa el contador del conjunto dentro de la transacción actual y devuelve la nueva versión.
+    """
+    table = ReferenceDataVersion.__table__
+    stmt = insert(table).values(name=name, version=1, updated_at=datetime.utcnow())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['name'],
+        set_={'version': table.c.version + 1, 'updated_at': stmt.excluded.updated_at}
+    ).returning(table.c.version)
+    return db.session.execute(stmt).scalar_one()
+
+
+def get_versions():
+    return dict(db.session.execute(select(ReferenceDataVersion.name, ReferenceDataVersion.version)).all())
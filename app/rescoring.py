@@ -0,0 +1,214 @@
+import hashlib
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event, select, delete, tuple_, literal, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, selectinload, joinedload
+from app import db
+from app.models import Profile, WorkExperience, SkillCategory, JobApplication, JobPosting, RescoreQueue
+from app.job_postings import profile_skill_names, experience_months, score_dependencies, score_profile
+from app.skill_experience import rebuild_profile_skill_experience
+from app.utils import normalize_skill_name
+
+# modelo -> (faceta, atributos de los que depende el puntaje)
+FACETS = {
+    SkillCategory: ('skills', ('skills',)),
+    WorkExperience: ('experience', ('start_date', 'end_date', 'current_job', 'description')),
+}
+ALL_FACETS = tuple(facet for facet, _ in FACETS.values())
+
+
+def _digest(value):
+    return hashlib.sha1(json.dumps(value, default=str, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+def facet_fingerprints(profile):
+    """
+    Huella de cada faceta del perfil: si no cambia, el puntaje que depende de ella tampoco.
+    """
+    return {
+        'skills': _digest(sorted({normalize_skill_name(skill) for skill in profile_skill_names(profile)})),
+        'experience': _digest(sorted(
+            (exp.start_date, exp.end_date, bool(exp.current_job), exp.description or '')
+            for exp in profile.work_experiences
+        )),
+    }
+
+
+def _profile_id(obj, previous=False):
+    if previous:
+        history = db.inspect(obj).attrs.profile_id.history
+        if history.deleted:
+            return history.deleted[0]
+    if obj.profile_id is not None:
+        return obj.profile_id
+    return obj.profile.id if obj.profile is not None else None
+
+
+def _changed(obj):
+    state = db.inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in FACETS[type(obj)][1] + ('profile_id',))
+
+
+def _collect_changes(session, flush_context, instances):
+    # Se reinicia en cada flush para no arrastrar cambios de un flush fallido
+    changes = session.info['rescore_changes'] = set()
+    for obj in session.new:
+        if type(obj) in FACETS:
+            changes.add((_profile_id(obj), FACETS[type(obj)][0]))
+    for obj in session.deleted:
+        if type(obj) in FACETS:
+            changes.add((_profile_id(obj, previous=True), FACETS[type(obj)][0]))
+    for obj in session.dirty:
+        if type(obj) in FACETS and _changed(obj):
+            # Un cambio de perfil afecta al perfil anterior y al nuevo
+            changes.add((_profile_id(obj, previous=True), FACETS[type(obj)][0]))
+            changes.add((_profile_id(obj), FACETS[type(obj)][0]))
+    deleted_profiles = {obj.id for obj in session.deleted if isinstance(obj, Profile)}
+    changes.difference_update({change for change in changes if change[0] is None or change[0] in deleted_profiles})
+
+
+def enqueue(connection, changes, debounce=None, max_delay=None):
+    """
+    Encola (profile_id, faceta) para re-puntuar. Cada edición posterga el vencimiento `debounce`
+    segundos, sin superar `max_delay` desde la primera edición pendiente.
+    """
+    config = current_app.config
+    debounce = config['RESCORE_DEBOUNCE_SECONDS'] if debounce is None else debounce
+    max_delay = config['RESCORE_MAX_DELAY_SECONDS'] if max_delay is None else max_delay
+    now = datetime.utcnow()
+    rows = [
+        {'profile_id': profile_id, 'facet': facet, 'enqueued_at': now, 'due_at': now + timedelta(seconds=debounce)}
+        for profile_id, facet in sorted(changes)
+    ]
+    if not rows:
+        return
+    table = RescoreQueue.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['profile_id', 'facet'],
+        set_={'due_at': func.least(stmt.excluded.due_at, table.c.enqueued_at + timedelta(seconds=max_delay))}
+    )
+    connection.execute(stmt, rows)
+
+
+def _flush_changes(session, flush_context):
+    changes = session.info.pop('rescore_changes', None)
+    if changes:
+        enqueue(session.connection(), changes)
+
+
+def register_listeners():
+    """
+    Encola en la misma transacción los perfiles cuyas habilidades o experiencia cambian a través del ORM.
+    """
+    if not event.contains(Session, 'before_flush', _collect_changes):
+        event.listen(Session, 'before_flush', _collect_changes)
+        event.listen(Session, 'after_flush', _flush_changes)
+
+
+def enqueue_all():
+    """
+    Encola todos los perfiles con postulaciones vinculadas a un puesto analizado, para vencer de inmediato.
+    """
+    now = datetime.utcnow()
+    total = 0
+    for facet in ALL_FACETS:
+        profiles = (
+            select(Profile.id, literal(facet), literal(now), literal(now))
+            .join(JobApplication, JobApplication.user_id == Profile.user_id)
+            .where(JobApplication.job_posting_id.isnot(None))
+            .distinct()
+        )
+        stmt = insert(RescoreQueue.__table__).from_select(['profile_id', 'facet', 'enqueued_at', 'due_at'], profiles)
+        stmt = stmt.on_conflict_do_update(index_elements=['profile_id', 'facet'], set_={'due_at': stmt.excluded.due_at})
+        total += db.session.execute(stmt).rowcount
+    db.session.commit()
+    return total
+
+
+def record_score(job_application, profile):
+    """
+    Calcula local_match_percentage de la postulación y guarda las huellas de las facetas con que se calculó.
+    """
+    requirements = job_application.job_posting.requirements if job_application.job_posting else None
+    score = score_profile(requirements, profile_skill_names(profile), experience_months(profile.work_experiences))
+    job_application.local_match_percentage = score['porcentaje'] if score else None
+    fingerprints = facet_fingerprints(profile)
+    job_application.score_facets = {facet: fingerprints[facet] for facet in score_dependencies(requirements) or ALL_FACETS}
+
+
+def rescore_application(job_application, profile, changed_facets, fingerprints):
+    """
+    Recalcula local_match_percentage si la postulación depende de alguna faceta que cambió. El porcentaje de la
+    IA (match_percentage) mide otra cosa y no se toca. Devuelve True si se actualizó.
+    """
+    requirements = job_application.job_posting.requirements
+    dependencies = score_dependencies(requirements)
+    if not dependencies & changed_facets:
+        return False
+    stored = job_application.score_facets or {}
+    if all(stored.get(facet) == fingerprints[facet] for facet in dependencies):
+        # La edición no cambió lo que usa el puntaje (p. ej. se deshizo antes de procesar la cola)
+        return False
+    score = score_profile(requirements, profile_skill_names(profile), experience_months(profile.work_experiences))
+    job_application.local_match_percentage = score['porcentaje']
+    job_application.score_facets = {facet: fingerprints[facet] for facet in dependencies}
+    return True
+
+
+def process_rescore_queue(batch_size=100):
+    """
+    Toma un lote de la cola vencida (FOR UPDATE SKIP LOCKED, así varios procesos pueden trabajar a la vez),
+    re-puntúa solo las postulaciones afectadas, actualiza profile_skill_experience de los perfiles con
+    experiencia modificada y confirma. Devuelve contadores del lote.
+    """
+    stats = {'entries': 0, 'profiles': 0, 'rescored': 0, 'skipped': 0}
+    due = (
+        select(RescoreQueue.profile_id, RescoreQueue.facet)
+        .where(RescoreQueue.due_at <= datetime.utcnow())
+        .order_by(RescoreQueue.due_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    taken = db.session.execute(
+        delete(RescoreQueue)
+        .where(tuple_(RescoreQueue.profile_id, RescoreQueue.facet).in_(due))
+        .returning(RescoreQueue.profile_id, RescoreQueue.facet)
+    ).all()
+    if not taken:
+        db.session.commit()
+        return stats
+
+    stats['entries'] = len(taken)
+    changed = defaultdict(set)
+    for profile_id, facet in taken:
+        changed[profile_id].add(facet)
+    profiles = Profile.query.options(
+        selectinload(Profile.skill_categories),
+        selectinload(Profile.work_experiences)
+    ).filter(Profile.id.in_(changed)).all()
+    profiles_by_user = {profile.user_id: profile for profile in profiles}
+
+    # El índice de experiencia por habilidad se deriva de las mismas ediciones
+    for profile in profiles:
+        if 'experience' in changed[profile.id]:
+            rebuild_profile_skill_experience(profile)
+
+    applications = JobApplication.query.options(joinedload(JobApplication.job_posting)).join(JobPosting).filter(
+        JobApplication.user_id.in_(profiles_by_user),
+        JobPosting.requirements.isnot(None)
+    ).all()
+    fingerprints = {profile.id: facet_fingerprints(profile) for profile in profiles}
+    for job_application in applications:
+        profile = profiles_by_user[job_application.user_id]
+        if rescore_application(job_application, profile, changed[profile.id], fingerprints[profile.id]):
+            stats['rescored'] += 1
+        else:
+            stats['skipped'] += 1
+
+    stats['profiles'] = len(profiles)
+    db.session.commit()
+    return stats
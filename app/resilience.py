@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import deque
+from sqlalchemy import text
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, stage, abandoned=False):
+        super().__init__(f'Se agotó el tiempo en la etapa {stage}')
+        self.stage = stage
+        # True si la llamada ya estaba en curso y se dejó de esperar (ver call_with_timeout)
+        self.abandoned = abandoned
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class Deadline:
+    """
+    Plazo total de una petición que se reparte entre las etapas (base de datos, IA, PDF).
+    """
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self, reserve=0.0):
+        return max(0.0, self.expires_at - time.monotonic() - reserve)
+
+    def check(self, stage, reserve=0.0):
+        if self.remaining(reserve) <= 0:
+            raise DeadlineExceeded(stage)
+
+    def shortened(self, seconds):
+        """Plazo que vence `seconds` antes, para reservar tiempo a las etapas siguientes."""
+        deadline = Deadline(0)
+        deadline.expires_at = self.expires_at - seconds
+        return deadline
+
+
+def call_with_timeout(fn, timeout, stage):
+    """
+    Ejecuta fn() en un hilo aparte y espera como máximo `timeout` segundos; si vence lanza DeadlineExceeded.
+    Sirve para clientes que no aceptan un timeout por petición: el hilo sigue hasta que fn() termine,
+    pero su resultado se descarta.
+    """
+    outcome = {}
+
+    def run():
+        try:
+            outcome['result'] = fn()
+        except BaseException as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run, name=f'{stage}-call', daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise DeadlineExceeded(stage, abandoned=True)
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+
+def apply_statement_timeout(session, deadline, reserve=0.0):
+    """
+    Limita las consultas de la transacción actual al tiempo que le queda a la petición (PostgreSQL).
+    """
+    deadline.check('db', reserve)
+    ms = max(1, int(deadline.remaining(reserve) * 1000))
+    session.execute(text("SELECT set_config('statement_timeout', :ms, true)"), {'ms': str(ms)})
+
+
+class CircuitBreaker:
+    """
+    Corta las llamadas a un proveedor cuando en la ventana reciente hay demasiados errores o
+    respuestas lentas. Abierto, falla de inmediato; pasado el enfriamiento deja pasar una
+    llamada de prueba (semiabierto) y se cierra si sale bien.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=5, window=20, slow_call_seconds=20.0, open_seconds=30.0):
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self._results = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._trial_running = False
+        return self._state
+
+    def check(self):
+        """Falla si el circuito está abierto, sin consumir la llamada de prueba del estado semiabierto."""
+        with self._lock:
+            if self._current_state() == self.OPEN:
+                raise CircuitOpenError('El proveedor de IA no está disponible temporalmente')
+
+    def before_call(self):
+        with self._lock:
+            state = self._current_state()
+            if state == self.OPEN or (state == self.HALF_OPEN and self._trial_running):
+                raise CircuitOpenError('El proveedor de IA no está disponible temporalmente')
+            if state == self.HALF_OPEN:
+                self._trial_running = True
+
+    def record(self, success, elapsed):
+        with self._lock:
+            ok = success and elapsed < self.slow_call_seconds
+            if self._state == self.HALF_OPEN:
+                self._trial_running = False
+                if ok:
+                    self._state = self.CLOSED
+                    self._results.clear()
+                else:
+                    self._open()
+                return
+            self._results.append(ok)
+            if list(self._results).count(False) >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._results.clear()
+
+    def call(self, fn, ignore=None):
+        """
+        Ejecuta fn() a través del circuito. Las excepciones para las que ignore(e) es verdadero
+        (por ejemplo, limitación de cuota) no cuentan como fallas del proveedor.
+        """
+        self.before_call()
+        start = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            if ignore and ignore(e):
+                with self._lock:
+                    self._trial_running = False
+            else:
+                self.record(False, time.monotonic() - start)
+            raise
+        self.record(True, time.monotonic() - start)
+        return result
@@ -1,20 +1,27 @@
 from flask import Blueprint, request, jsonify
 from app import db
-from app.models import User, Profile, Resume, Postulacion, WorkExperience, Education, Language, Certificate, Skill, SkillType, SkillCategory, StandardSkill
+from app.models import User, Profile, Resume, Postulacion, WorkExperience, Education, Language, Certificate, SkillCategory, StandardSkill, JobApplication, CvAnalysis
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from sqlalchemy.orm import joinedload
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import selectinload
 from datetime import datetime
-from flask import render_template, make_response
-import pdfkit
+from flask import make_response, url_for, Response, stream_with_context, current_app
 from app.nlp_utils import analyze_profile_job
-import json
+from app.llm_scheduler import QuotaExceededError
+from app.exporters import export_analysis, export_pdf, export_basic_pdf, ExportError
+from app.resilience import Deadline, DeadlineExceeded, CircuitOpenError, apply_statement_timeout
+from app.utils import admin_token_required
+from app.serializers import API_SCHEMAS, profile_api_view, profile_prompt_view
+from app.analytics import get_application_stats, GLOBAL_SCOPE
+from app.tracing import tracer, current_span
+from app.job_postings import get_or_create_job_posting, find_job_posting, needs_parsing, parse_due, schedule_parsing
+from app.rescoring import record_score
+from app.reference_cache import get_reference_cache
+import io
 
 
-
-# Cambiar config por pdfkit_config
-pdfkit_config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-
 routes = Blueprint('routes', __name__)
 # Crear un Blueprint para las rutas principales
 main_bp = Blueprint("main", __name__)
@@ -39,7 +46,7 @@ def register():
 def login():
     data = request.get_json()
     user = User.query.filter_by(email=data['email']).first()
-    if user and check_password_hash(user.password_hash, data['password']):
+    if user and user.deletion_requested_at is None and check_password_hash(user.password_hash, data['password']):
         access_token = create_access_token(identity=str(user.id))  # ✅ Convertir a string
         return jsonify({'access_token': access_token, "user_id": user.id}), 200
     return jsonify({'message': 'Credenciales inválidas'}), 401
@@ -117,9 +124,14 @@ def get_applications():
 def create_application():
     user_id = get_jwt_identity()
     data = request.get_json()
-    new_application = Postulacion(usuario_id=user_id, nombre_cargo=data['nombre_cargo'], empresa=data.get('empresa'), estado='En Progreso')
+    new_application = Postulacion(usuario_id=user_id, nombre_cargo=data['nombre_cargo'], empresa=data.get('empresa'), estado='En Progreso',
+                                  descripcion=data.get('descripcion'), link=data.get('link'))
+    # La descripción se comparte con otras postulaciones a la misma oferta y se analiza en segundo plano
+    job_posting = new_application.job_posting = get_or_create_job_posting(data.get('descripcion'), data['nombre_cargo'])
     db.session.add(new_application)
     db.session.commit()
+    if job_posting is not None and needs_parsing(job_posting) and parse_due(job_posting):
+        schedule_parsing(current_app._get_current_object(), job_posting.description, job_posting.title)
     return jsonify({'message': 'Postulación creada exitosamente'}), 201
 
 # Actualizar el estado de una postulación
@@ -143,61 +155,16 @@ def get_user_profile():
     if not user:
         return jsonify({'message': 'Usuario no encontrado'}), 404
     
-    # Cargar relaciones de manera eager
+    # Cargar el perfil con todas sus colecciones en consultas por lote
     profile = Profile.query.options(
-        joinedload(Profile.work_experiences)
+        selectinload(Profile.work_experiences),
+        selectinload(Profile.educations),
+        selectinload(Profile.languages),
+        selectinload(Profile.certificates),
+        selectinload(Profile.skill_categories)
     ).filter_by(user_id=user_id).first()
 
-    # Obtener skills desde skill_categories
-    tech_category = SkillCategory.query.filter_by(
-        profile_id=profile.id,
-        skill_type_id=1  # ID para habilidades técnicas
-    ).first()
-    
-    soft_category = SkillCategory.query.filter_by(
-        profile_id=profile.id,
-        skill_type_id=2  # ID para habilidades blandas
-    ).first()
-
-    profile = Profile.query.filter_by(user_id=user_id).first()
-    profile_data = {
-        'nombre': user.name,
-        'email': user.email,
-        'telefono': user.phone,
-        'direccion': user.address,
-        'linkedin_url': profile.linkedin_url if profile else None,
-        'github_url': profile.github_url if profile else None,
-        'experiencia_laboral': [{
-            'id': exp.id,  # <- Incluir el ID
-            'empresa': exp.company,
-            'cargo': exp.position,
-            'fecha_inicio': exp.start_date.isoformat() if exp.start_date else None,
-            'fecha_fin': exp.end_date.isoformat() if exp.end_date else None,
-            'descripcion': exp.description,
-            'trabajo_actual': exp.current_job
-        } for exp in profile.work_experiences] if profile else [],
-        'educacion': [{
-            'institucion': edu.institution,
-            'titulo': edu.degree,
-            'fecha_inicio': edu.start_date.isoformat() if edu.start_date else None,
-            'fecha_fin': edu.end_date.isoformat() if edu.end_date else None,
-            'descripcion': edu.description
-        } for edu in profile.educations] if profile else [],
-        'idiomas': [{
-            'idioma': lang.language,
-            'nivel': lang.level
-        } for lang in profile.languages] if profile else [],
-        'certificados': [{
-            'nombre': cert.name,
-            'institucion': cert.institution,
-            'fecha': cert.date.isoformat() if cert.date else None,
-            'url': cert.url
-        } for cert in profile.certificates] if profile else [],
-        'habilidades': {
-            'habilidades_tecnicas': tech_category.skills if tech_category else [],
-        'habilidades_blandas': soft_category.skills if soft_category else []
-        } 
-    }
+    profile_data = profile_api_view(user, profile)
     return jsonify(profile_data), 200
 
 @routes.route('/api/user/profile', methods=['POST'])
@@ -287,9 +254,9 @@ def update_work_experience():
         db.session.commit()
         return jsonify({'message': 'Experiencia laboral actualizada exitosamente'}), 200
 
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        print(f"Error en work-experience: {str(e)}")
+        current_app.logger.exception("Error en work-experience")
         return jsonify({'message': 'Error interno del servidor'}), 500
     try:
         user_id = get_jwt_identity()
@@ -332,9 +299,9 @@ def update_work_experience():
             
         db.session.commit()
         return jsonify({'message': 'Experiencia laboral actualizada exitosamente'}), 200
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        print(f"Error: {str(e)}")
+        current_app.logger.exception("Error en work-experience")
         return jsonify({'message': 'Error interno del servidor'}), 500
 
 @routes.route('/api/user/education', methods=['POST'])
@@ -388,9 +355,9 @@ def update_education():
         db.session.commit()
         return jsonify({'message': 'Educación actualizada exitosamente'}), 200
 
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        print(f"Error en educación: {str(e)}")
+        current_app.logger.exception("Error en educación")
         return jsonify({'message': 'Error interno del servidor'}), 500
 
 @routes.route('/api/user/languages', methods=['POST'])
@@ -454,16 +421,19 @@ def add_skills():
         user_id = get_jwt_identity()
         data = request.get_json()
         profile = Profile.query.filter_by(user_id=user_id).first()
+        cache = get_reference_cache()
+        tech_type_id = cache.skill_type_id('tech')
+        soft_type_id = cache.skill_type_id('soft')
 
         # Obtener skills actuales
         tech_category = SkillCategory.query.filter_by(
             profile_id=profile.id,
-            skill_type_id=1
+            skill_type_id=tech_type_id
         ).first()
         
         soft_category = SkillCategory.query.filter_by(
             profile_id=profile.id,
-            skill_type_id=2
+            skill_type_id=soft_type_id
         ).first()
 
         # Actualizar técnicas (combinar existentes + nuevas)
@@ -474,7 +444,7 @@ def add_skills():
         else:
             tech_category = SkillCategory(
                 profile_id=profile.id,
-                skill_type_id=1,
+                skill_type_id=tech_type_id,
                 skills=data.get('tecnicas', [])
             )
             db.session.add(tech_category)
@@ -487,7 +457,7 @@ def add_skills():
         else:
             soft_category = SkillCategory(
                 profile_id=profile.id,
-                skill_type_id=2,
+                skill_type_id=soft_type_id,
                 skills=data.get('blandas', [])
             )
             db.session.add(soft_category)
@@ -507,35 +477,41 @@ def search_skills():
         user_id = get_jwt_identity()
         query = request.args.get('q', '').lower()
         skill_type = request.args.get('type')  # 'tech' o 'soft'
+        cache = get_reference_cache()
+        skill_type_id = cache.skill_type_id('tech' if skill_type == 'tech' else 'soft')
+        tech_type_id = cache.skill_type_id('tech')
         
         # Obtener skills ya existentes del usuario
         profile = Profile.query.filter_by(user_id=user_id).first()
         skill_category = SkillCategory.query.filter_by(
             profile_id=profile.id,
-            skill_type_id=1 if skill_type == 'tech' else 2
+            skill_type_id=skill_type_id
         ).first()
         existing_skills = skill_category.skills if skill_category else []
 
-        # Buscar en standard_skills
+        # La búsqueda por subcadena usa el índice de trigramas de standard_skills
         results = StandardSkill.query.filter(
             StandardSkill.normalized_name.ilike(f"%{query}%"),
-            StandardSkill.skill_type_id == (1 if skill_type == 'tech' else 2),
+            StandardSkill.skill_type_id == skill_type_id,
             ~StandardSkill.normalized_name.in_(existing_skills)
         ).limit(10).all()
 
         return jsonify([{
             'value': skill.normalized_name,
             'label': skill.display_name,
-            'type': 'tech' if skill.skill_type_id == 1 else 'soft'
+            'type': 'tech' if skill.skill_type_id == tech_type_id else 'soft'
         } for skill in results]), 200
 
-    except Exception as e:
-        print(f"Error en búsqueda: {str(e)}")
+    except Exception:
+        current_app.logger.exception("Error en búsqueda de habilidades")
         return jsonify([]), 200
 
 
 @routes.route('/api/generate-cv/<int:user_id>', methods=['POST'])
+@jwt_required()
 def generate_cv(user_id):
+    if int(get_jwt_identity()) != user_id:
+        return jsonify({'error': 'No autorizado'}), 403
     data = request.get_json()
     if not data:
         return jsonify({'error': 'No se recibieron datos'}), 400
@@ -543,68 +519,166 @@ def generate_cv(user_id):
     job_title = data.get("job_title")
     job_description = data.get("job_description")
 
+    # Plazo total de la petición, repartido entre base de datos, IA y PDF
+    deadline = Deadline(current_app.config['CV_PIPELINE_TIMEOUT'])
+    pdf_reserve = current_app.config['CV_PDF_RESERVE_SECONDS']
+
     # Obtener datos del usuario y perfil
-    user = User.query.get_or_404(user_id)
-    profile = Profile.query.options(
-        joinedload(Profile.work_experiences),
-        joinedload(Profile.educations),
-        joinedload(Profile.languages),
-        joinedload(Profile.certificates),
-        joinedload(Profile.skill_categories)
-    ).filter_by(user_id=user_id).first()
+    try:
+        with tracer.span('cv.load_profile', **{'user.id': user_id}):
+            apply_statement_timeout(db.session, deadline, reserve=pdf_reserve)
+            user = User.query.get_or_404(user_id)
+            profile = Profile.query.options(
+                selectinload(Profile.work_experiences),
+                selectinload(Profile.educations),
+                selectinload(Profile.languages),
+                selectinload(Profile.certificates),
+                selectinload(Profile.skill_categories)
+            ).filter_by(user_id=user_id).first()
+            job_posting = find_job_posting(job_description)
+    except OperationalError:
+        db.session.rollback()
+        return jsonify({"error": "Tiempo de espera agotado al cargar el perfil"}), 503
 
     if not profile:
         return jsonify({"error": "Perfil no encontrado"}), 404
 
     # Crear estructura de datos para el perfil
-    profile_data = {
-        "nombre": user.name,
-        "contacto": {
-            "correo": user.email,
-            "telefono": user.phone,
-            "linkedin": profile.linkedin_url  # Asume que tienes un campo linkedin en tu modelo de perfil
-        },
-        "experiencia_laboral": [
-            {"empresa": exp.company, "cargo": exp.position, "descripcion": exp.description, "fecha_inicio": exp.start_date.strftime('%Y-%m-%d'), "fecha_fin": exp.end_date.strftime('%Y-%m-%d') if exp.end_date else "Actualidad"}
-            for exp in profile.work_experiences
-        ],
-        "educacion": [
-            {"institucion": edu.institution, "titulo": edu.degree, "fecha_inicio": edu.start_date.strftime('%Y-%m-%d'), "fecha_fin": edu.end_date.strftime('%Y-%m-%d') if edu.end_date else "En curso"}
-            for edu in profile.educations
-        ],
-        "idiomas": [
-            {"idioma": lang.language, "nivel": lang.level}
-            for lang in profile.languages
-        ],
-        "certificaciones": [
-            {"nombre": cert.name, "institucion": cert.institution, "fecha": cert.date.strftime('%Y-%m-%d')}
-            for cert in profile.certificates
-        ],
-        "habilidades": [
-            {"categoria": cat.skill_type.name, "lista": [skill.replace("_", " ").title() for skill in cat.skills]}
-            for cat in profile.skill_categories
-        ]
-    }
-
-    # Llamar a la función de análisis
-    ai_data = analyze_profile_job(job_description, profile_data)
-
-    if not ai_data:
-        return jsonify({"error": "Error al obtener respuesta de la IA"}), 500
-
-    # Generar el PDF con la información adaptada
-    html = render_template(
-        'cv_template.html',
+    profile_data = profile_prompt_view(user, profile)
+
+    # Los requisitos del puesto se extraen una sola vez, en segundo plano, y se reutilizan para todos los
+    # candidatos; mientras no estén listos la IA trabaja solo con el texto de la descripción
+    requirements = None
+    if job_posting is not None and not needs_parsing(job_posting):
+        requirements = job_posting.requirements
+    elif job_posting is None or parse_due(job_posting):
+        schedule_parsing(current_app._get_current_object(), job_description, job_title)
+
+    # Llamar a la función de análisis; si la IA no responde a tiempo se genera un CV sin IA.
+    degraded = None
+    try:
+        ai_deadline = deadline.shortened(pdf_reserve)
+        ai_data = analyze_profile_job(job_description, profile_data, user_id=user_id, deadline=ai_deadline,
+                                      requirements=requirements)
+    except QuotaExceededError as e:
+        response = jsonify({"error": "Se alcanzó el límite de uso de la IA, intenta nuevamente en unos momentos"})
+        response.headers['Retry-After'] = str(max(1, int(e.retry_after or 1)))
+        return response, 429
+    except CircuitOpenError:
+        degraded = 'circuit_open'
+    except DeadlineExceeded:
+        degraded = 'timeout'
+    else:
+        if not ai_data:
+            degraded = 'ai_error'
+    if degraded:
+        current_span().set_attribute('cv.degraded', degraded)
+
+    filename = f'cv_{user.name}_{job_title}.pdf'
+    try:
+        if degraded:
+            pdf = export_basic_pdf(job_title, profile_data, timeout=deadline.remaining())
+            response = make_response(pdf)
+            response.headers['X-CV-Degraded'] = degraded
+        else:
+            # Guardar el análisis como una nueva versión del CV para poder reexportarlo sin llamar a la IA
+            with tracer.span('cv.save_analysis'):
+                analysis = save_analysis(user, data, job_title, job_description, profile_data, ai_data, job_posting, profile)
+
+            # Generar el PDF con la información adaptada
+            pdf = export_pdf(analysis, timeout=deadline.remaining())
+            response = make_response(pdf)
+            response.headers['X-Analysis-Id'] = str(analysis.id)
+    except DeadlineExceeded:
+        return jsonify({"error": "Tiempo de espera agotado al generar el PDF"}), 504
+
+    response.headers['Content-Type'] = 'application/pdf'
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def save_analysis(user, data, job_title, job_description, profile_data, ai_data, job_posting=None, profile=None):
+    """
+    Guarda la respuesta de la IA como una versión del CV (Resume) y, si se indica, la vincula a una postulación.
+    """
+    resume = None
+    if data.get('resume_id'):
+        # El bloqueo serializa las generaciones concurrentes del mismo CV al calcular el número de versión
+        resume = Resume.query.filter_by(id=data['resume_id'], user_id=user.id).with_for_update().first()
+    if not resume:
+        resume = Resume(user_id=user.id, title=f"CV {job_title or ''}".strip()[:100], description=job_description, category='ia')
+        db.session.add(resume)
+        db.session.flush()
+
+    job_application = None
+    if data.get('job_application_id'):
+        job_application = JobApplication.query.filter_by(id=data['job_application_id'], user_id=user.id).first()
+
+    last_version = db.session.query(func.max(CvAnalysis.version)).filter_by(resume_id=resume.id).scalar()
+    analysis = CvAnalysis(
+        user_id=user.id,
+        resume_id=resume.id,
+        job_application_id=job_application.id if job_application else None,
+        version=(last_version or 0) + 1,
         job_title=job_title,
-        ai_data=ai_data,
-        profile_data=profile_data
+        job_description=job_description,
+        profile_data=profile_data,
+        ai_data=ai_data
     )
+    db.session.add(analysis)
+    db.session.flush()
+
+    resume.file_url = url_for('routes.export_cv_analysis', analysis_id=analysis.id, fmt='pdf')
+
+    if job_application:
+        if job_application.job_posting_id is None:
+            job_application.job_posting = job_posting or get_or_create_job_posting(job_description, job_title)
+        try:
+            job_application.match_percentage = int(str(ai_data['compatibilidad']['porcentaje']).strip().rstrip('%'))
+        except (KeyError, TypeError, ValueError):
+            pass
+        # El puntaje local contra los requisitos del puesto se guarda aparte y lo mantiene la cola de re-puntaje
+        if profile:
+            record_score(job_application, profile)
 
+    db.session.commit()
+    return analysis
 
-    pdf = pdfkit.from_string(html, False, configuration=pdfkit_config)
-    response = make_response(pdf)
-    response.headers['Content-Type'] = 'application/pdf'
-    response.headers['Content-Disposition'] = f'attachment; filename="cv_{user.name}_{job_title}.pdf"'
+
+# Listar las versiones de análisis de un CV
+@routes.route('/api/cvs/<int:id>/analyses', methods=['GET'])
+@jwt_required()
+def get_cv_analyses(id):
+    user_id = get_jwt_identity()
+    resume = Resume.query.filter_by(id=id, user_id=user_id).first()
+    if not resume:
+        return jsonify({'message': 'CV no encontrado'}), 404
+    return jsonify([{
+        'id': a.id,
+        'version': a.version,
+        'job_title': a.job_title,
+        'job_application_id': a.job_application_id,
+        'created_at': a.created_at.isoformat() if a.created_at else None
+    } for a in resume.analyses]), 200
+
+
+# Exportar un análisis guardado (pdf, txt, json, docx) sin volver a llamar a la IA
+@routes.route('/api/analyses/<int:analysis_id>/export/<fmt>', methods=['GET'])
+@jwt_required()
+def export_cv_analysis(analysis_id, fmt):
+    user_id = get_jwt_identity()
+    analysis = CvAnalysis.query.filter_by(id=analysis_id, user_id=user_id).first()
+    if not analysis:
+        return jsonify({'message': 'Análisis no encontrado'}), 404
+
+    try:
+        content, mimetype = export_analysis(analysis, fmt)
+    except ExportError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = make_response(content)
+    response.headers['Content-Type'] = mimetype
+    response.headers['Content-Disposition'] = f'attachment; filename="cv_{analysis.resume_id}_v{analysis.version}.{fmt}"'
     return response
 
 
@@ -615,16 +689,17 @@ def get_user_skills():
     try:
         user_id = get_jwt_identity()
         profile = Profile.query.filter_by(user_id=user_id).first()
+        cache = get_reference_cache()
         
         # Obtener skills desde skill_categories
         tech_category = SkillCategory.query.filter_by(
             profile_id=profile.id,
-            skill_type_id=1
+            skill_type_id=cache.skill_type_id('tech')
         ).first()
         
         soft_category = SkillCategory.query.filter_by(
             profile_id=profile.id,
-            skill_type_id=2
+            skill_type_id=cache.skill_type_id('soft')
         ).first()
 
         return jsonify({
@@ -639,11 +714,7 @@ def get_user_skills():
 @routes.route('/api/skill_categories', methods=['GET'])
 def get_skill_categories():
         categories = SkillCategory.query.all()
-        return jsonify([{
-        'id': c.id,
-        'tipo': c.skill_type_id,  # Asumiendo que el campo se llama 'name' en tu modelo
-        'descripcion': c.skills
-} for c in categories]), 200
+        return jsonify(API_SCHEMAS[SkillCategory].dump_many(categories)), 200
 
 # Añade este endpoint
 
@@ -662,7 +733,7 @@ def update_skills():
             return jsonify({'error': 'Perfil no encontrado'}), 404
         
         # Determinar el skill_type_id
-        skill_type_id = 1 if skill_type == "tech" else 2
+        skill_type_id = get_reference_cache().skill_type_id('tech' if skill_type == "tech" else 'soft')
 
         skill_category = SkillCategory.query.filter_by(
             profile_id=profile.id, skill_type_id=skill_type_id
@@ -684,4 +755,132 @@ def update_skills():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-    
+
+# Importación masiva de perfiles (JSON Lines con formato JSON Resume o CSV)
+@routes.route('/api/admin/import/profiles', methods=['POST'])
+@admin_token_required
+def import_profiles_endpoint():
+    from app.bulk_import import import_profiles, iter_jsonl_records, iter_csv_records
+
+    fmt = request.args.get('format', 'jsonl')
+    if fmt not in ('jsonl', 'csv'):
+        return jsonify({'message': 'Formato no soportado'}), 400
+
+    reader = iter_csv_records if fmt == 'csv' else iter_jsonl_records
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    try:
+        # Sin pool de procesos dentro del worker web; los archivos grandes se cargan con `flask import-profiles`
+        stats = import_profiles(reader(stream), batch_size=request.args.get('batch_size', 1000, type=int), workers=0)
+    except Exception:
+        current_app.logger.exception("Error en importación masiva")
+        return jsonify({'message': 'Error interno del servidor'}), 500
+    return jsonify(stats), 200
+
+
+# Exportación completa en JSON Lines (users, profiles, postulaciones, job_applications)
+@routes.route('/api/admin/export/<entity>', methods=['GET'])
+@admin_token_required
+def export_ndjson(entity):
+    from app.ndjson_export import EXPORTS, iter_ndjson, gzip_stream
+
+    if entity not in EXPORTS:
+        return jsonify({'message': 'Entidad no soportada'}), 404
+
+    chunks = iter_ndjson(entity, yield_per=request.args.get('yield_per', 1000, type=int))
+    filename = f'{entity}.ndjson'
+    mimetype = 'application/x-ndjson'
+    if request.args.get('gzip') in ('1', 'true'):
+        chunks = gzip_stream(chunks)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+# Estadísticas de postulaciones del usuario (embudo por estado, empresas, distribución de compatibilidad)
+@routes.route('/api/analytics/applications', methods=['GET'])
+@jwt_required()
+def get_user_application_stats():
+    user_id = int(get_jwt_identity())
+    return jsonify(get_application_stats(user_id)), 200
+
+
+# Estadísticas globales de postulaciones
+@routes.route('/api/admin/analytics/applications', methods=['GET'])
+@admin_token_required
+def get_global_application_stats():
+    return jsonify(get_application_stats(GLOBAL_SCOPE)), 200
+
+
+# Métricas de la caché de datos de referencia de este proceso
+@routes.route('/api/admin/reference-cache', methods=['GET'])
+@admin_token_required
+def get_reference_cache_stats():
+    return jsonify(get_reference_cache().stats()), 200
+
+
+# Búsqueda de candidatos por experiencia en una habilidad (?skill=python&min_years=3&current=1)
+@routes.route('/api/admin/candidates/by-skill', methods=['GET'])
+@admin_token_required
+def search_candidates_by_skill():
+    from app.skill_experience import search_by_experience
+
+    skill = request.args.get('skill', '').strip()
+    if not skill:
+        return jsonify({'error': 'Falta el parámetro skill'}), 400
+    try:
+        min_years = float(request.args.get('min_years', 0))
+        used_since = datetime.strptime(request.args['used_since'], '%Y-%m-%d').date() if request.args.get('used_since') else None
+        limit = min(int(request.args.get('limit', 50)), 500)
+    except ValueError:
+        return jsonify({'error': 'Parámetros inválidos'}), 400
+    current = request.args.get('current')
+    results = search_by_experience(
+        skill,
+        min_months=round(min_years * 12),
+        current=None if current is None else current.lower() in ('1', 'true'),
+        used_since=used_since,
+        limit=limit
+    )
+    return jsonify(results), 200
+
+
+# Feed de cambios: entidades creadas, modificadas o borradas desde el cursor del cliente
+@routes.route('/api/sync/changes', methods=['GET'])
+@jwt_required()
+def get_sync_changes():
+    from app.sync import get_changes, parse_cursor, CursorExpiredError
+
+    user_id = int(get_jwt_identity())
+    try:
+        since = parse_cursor(request.args.get('cursor'))
+    except ValueError:
+        return jsonify({'message': 'Cursor inválido'}), 400
+
+    try:
+        changes = get_changes(
+            user_id, since,
+            overlap_seconds=current_app.config['SYNC_CURSOR_OVERLAP_SECONDS'],
+            retention_days=current_app.config['SYNC_TOMBSTONE_RETENTION_DAYS']
+        )
+    except CursorExpiredError:
+        return jsonify({'message': 'Cursor expirado, se requiere una sincronización completa'}), 410
+    return jsonify(changes), 200
+
+
+# Solicitar el borrado de la cuenta; la purga se ejecuta en segundo plano
+@routes.route('/api/user/account', methods=['DELETE'])
+@jwt_required()
+def delete_account():
+    from app.account_purge import request_account_deletion
+
+    user_id = get_jwt_identity()
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({'message': 'Usuario no encontrado'}), 404
+    if user.deletion_requested_at is None:
+        request_account_deletion(current_app._get_current_object(), user)
+    return jsonify({'message': 'La cuenta se eliminará en unos momentos'}), 202
+
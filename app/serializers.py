@@ -0,0 +1,176 @@
+from operator import attrgetter
+from flask.json.provider import DefaultJSONProvider
+from app import db
+from app.models import WorkExperience, Education, Language, Certificate, SkillCategory
+from app.reference_cache import get_reference_cache
+
+try:
+    import orjson  # Backend JSON rápido (requirements.txt); sin él se usa el de Flask
+except ImportError:
+    orjson = None
+
+
+class Field:
+    def __init__(self, attr, key=None, fmt=None):
+        self.attr = attr
+        self.key = key or attr
+        self.fmt = fmt
+
+
+class Schema:
+    """
+    Esquema declarativo de un modelo. Al construirse arma un getter por campo (operator.attrgetter,
+    con el formateador ya aplicado) para no resolver los campos en cada llamada.
+    """
+
+    def __init__(self, *fields):
+        self.fields = fields
+        self._getters = [(field.key, self._getter(field)) for field in fields]
+
+    @staticmethod
+    def _getter(field):
+        get = attrgetter(field.attr)
+        if field.fmt is None:
+            return get
+        fmt = field.fmt
+        return lambda obj: fmt(get(obj))
+
+    def dump(self, obj):
+        return {key: get(obj) for key, get in self._getters}
+
+    def dump_many(self, objs):
+        dump = self.dump
+        return [dump(obj) for obj in objs]
+
+
+def iso_date(value):
+    return value.isoformat() if value else None
+
+
+def ymd(value):
+    return value.strftime('%Y-%m-%d') if value else None
+
+
+def ymd_or(default):
+    return lambda value: value.strftime('%Y-%m-%d') if value else default
+
+
+def skill_labels(skills):
+    return [skill.replace("_", " ").title() for skill in skills or []]
+
+
+def skill_type_name(skill_type_id):
+    # Desde la caché de referencia, sin cargar la relación skill_type de cada categoría
+    return get_reference_cache().skill_type_name(skill_type_id)
+
+
+def columns_schema(model, exclude=()):
+    """
+    Esquema con todas las columnas del modelo (fechas en ISO 8601), usado por el feed de sincronización.
+    """
+    fields = []
+    for column in model.__table__.columns:
+        if column.key in exclude:
+            continue
+        is_date = isinstance(column.type, (db.Date, db.DateTime))
+        fields.append(Field(column.key, fmt=iso_date if is_date else None))
+    return Schema(*fields)
+
+
+# Vista de la API (/api/user/profile)
+API_SCHEMAS = {
+    WorkExperience: Schema(
+        Field('id'), Field('company', 'empresa'), Field('position', 'cargo'),
+        Field('start_date', 'fecha_inicio', iso_date), Field('end_date', 'fecha_fin', iso_date),
+        Field('description', 'descripcion'), Field('current_job', 'trabajo_actual')
+    ),
+    Education: Schema(
+        Field('institution', 'institucion'), Field('degree', 'titulo'),
+        Field('start_date', 'fecha_inicio', iso_date), Field('end_date', 'fecha_fin', iso_date),
+        Field('description', 'descripcion')
+    ),
+    Language: Schema(Field('language', 'idioma'), Field('level', 'nivel')),
+    Certificate: Schema(
+        Field('name', 'nombre'), Field('institution', 'institucion'),
+        Field('date', 'fecha', iso_date), Field('url')
+    ),
+    SkillCategory: Schema(Field('id'), Field('skill_type_id', 'tipo'), Field('skills', 'descripcion')),
+}
+
+# Vista para el prompt de la IA (generate_cv)
+PROMPT_SCHEMAS = {
+    WorkExperience: Schema(
+        Field('company', 'empresa'), Field('position', 'cargo'), Field('description', 'descripcion'),
+        Field('start_date', 'fecha_inicio', ymd), Field('end_date', 'fecha_fin', ymd_or('Actualidad'))
+    ),
+    Education: Schema(
+        Field('institution', 'institucion'), Field('degree', 'titulo'),
+        Field('start_date', 'fecha_inicio', ymd), Field('end_date', 'fecha_fin', ymd_or('En curso'))
+    ),
+    Language: API_SCHEMAS[Language],
+    Certificate: Schema(Field('name', 'nombre'), Field('institution', 'institucion'), Field('date', 'fecha', ymd)),
+    SkillCategory: Schema(Field('skill_type_id', 'categoria', skill_type_name), Field('skills', 'lista', skill_labels)),
+}
+
+
+def profile_api_view(user, profile):
+    """
+    Perfil completo tal como lo devuelve GET /api/user/profile.
+    """
+    cache = get_reference_cache()
+    categories = {cat.skill_type_id: cat for cat in profile.skill_categories} if profile else {}
+    tech_category = categories.get(cache.skill_type_id('tech'))
+    soft_category = categories.get(cache.skill_type_id('soft'))
+    return {
+        'nombre': user.name,
+        'email': user.email,
+        'telefono': user.phone,
+        'direccion': user.address,
+        'linkedin_url': profile.linkedin_url if profile else None,
+        'github_url': profile.github_url if profile else None,
+        'experiencia_laboral': API_SCHEMAS[WorkExperience].dump_many(profile.work_experiences) if profile else [],
+        'educacion': API_SCHEMAS[Education].dump_many(profile.educations) if profile else [],
+        'idiomas': API_SCHEMAS[Language].dump_many(profile.languages) if profile else [],
+        'certificados': API_SCHEMAS[Certificate].dump_many(profile.certificates) if profile else [],
+        'habilidades': {
+            'habilidades_tecnicas': tech_category.skills if tech_category else [],
+            'habilidades_blandas': soft_category.skills if soft_category else []
+        }
+    }
+
+
+def profile_prompt_view(user, profile):
+    """
+    Perfil que se envía a la IA para adaptar el CV.
+    """
+    return {
+        "nombre": user.name,
+        "contacto": {
+            "correo": user.email,
+            "telefono": user.phone,
+            "linkedin": profile.linkedin_url
+        },
+        "experiencia_laboral": PROMPT_SCHEMAS[WorkExperience].dump_many(profile.work_experiences),
+        "educacion": PROMPT_SCHEMAS[Education].dump_many(profile.educations),
+        "idiomas": PROMPT_SCHEMAS[Language].dump_many(profile.languages),
+        "certificaciones": PROMPT_SCHEMAS[Certificate].dump_many(profile.certificates),
+        "habilidades": PROMPT_SCHEMAS[SkillCategory].dump_many(profile.skill_categories)
+    }
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Usa orjson cuando está instalado y mantiene el formato de Flask para fechas y tipos especiales.
+    """
+
+    def dumps(self, obj, **kwargs):
+        # response() solo pasa indent=2 (modo debug) o los separadores compactos
+        extra = {k: v for k, v in kwargs.items() if k not in ('indent', 'separators')}
+        if orjson is None or extra or kwargs.get('indent') not in (None, 2):
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
@@ -0,0 +1,214 @@
+import csv
+import json
+import re
+import unicodedata
+from itertools import islice
+from sqlalchemy import select, func, literal_column, or_
+from sqlalchemy.dialects.postgresql import insert
+from app import db
+from app.models import SkillType, StandardSkill, StandardSkillAlias
+from app.reference_data import bump_version, reference_data_changed
+from app.utils import normalize_skill_name
+
+CATALOG_BATCH_SIZE = 5000
+MAX_NAME_LENGTH = 100
+MAX_REPORTED_ERRORS = 100
+CATALOG = 'standard_skills'
+
+# Valores de la columna de tipo (incluidos los de ESCO) -> skill_types.name normalizado
+TYPE_NAMES = {
+    'tech': 'tecnica', 'technical': 'tecnica', 'hard': 'tecnica', 'knowledge': 'tecnica', 'tecnica': 'tecnica',
+    'soft': 'blanda', 'transversal': 'blanda', 'blanda': 'blanda',
+}
+
+_ALIAS_SEPARATORS = re.compile(r'[|\n]')
+
+
+def _entry(name, skill_type=None, aliases=None):
+    if isinstance(aliases, str):
+        aliases = _ALIAS_SEPARATORS.split(aliases)
+    return {
+        'name': (name or '').strip(),
+        'type': (skill_type or '').strip(),
+        'aliases': [alias.strip() for alias in aliases or [] if alias and alias.strip()],
+    }
+
+
+def iter_catalog_csv(stream):
+    """
+    Lee el catálogo desde CSV con columnas name, type y aliases (separados por '|' o saltos de línea).
+    También acepta las columnas de ESCO: preferredLabel, skillType y altLabels.
+    """
+    for row in csv.DictReader(stream):
+        yield _entry(
+            row.get('name') or row.get('preferredLabel'),
+            row.get('type') or row.get('skillType'),
+            row.get('aliases') or row.get('altLabels')
+        )
+
+
+def iter_catalog_jsonl(stream):
+    """
+    Lee el catálogo desde JSON Lines: {"name": ..., "type": ..., "aliases": [...]} por línea.
+    """
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            doc = json.loads(line)
+            yield _entry(doc.get('name'), doc.get('type'), doc.get('aliases'))
+        except (ValueError, AttributeError) as e:
+            yield {'name': '', 'type': '', 'aliases': [], 'error': f'Línea {line_no}: JSON inválido ({e})'}
+
+
+def type_key(value):
+    # "Técnica" -> "tecnica"
+    value = unicodedata.normalize('NFKD', str(value))
+    return normalize_skill_name(''.join(c for c in value if not unicodedata.combining(c)))
+
+
+def skill_type_ids():
+    """{tipo normalizado: skill_type_id}, con los sinónimos de TYPE_NAMES."""
+    by_name = {type_key(name): type_id
+               for type_id, name in db.session.execute(select(SkillType.id, SkillType.name)).all()}
+    ids = dict(by_name)
+    for synonym, name in TYPE_NAMES.items():
+        if name in by_name:
+            ids[synonym] = by_name[name]
+    return ids
+
+
+def _normalize_batch(batch):
+    # Normaliza todos los nombres y alias del lote de una vez, antes de consultar la base de datos
+    names = [normalize_skill_name(entry['name'])[:MAX_NAME_LENGTH] for entry in batch]
+    aliases = [[normalize_skill_name(alias)[:MAX_NAME_LENGTH] for alias in entry['aliases']] for entry in batch]
+    return names, aliases
+
+
+def _existing_aliases(keys):
+    if not keys:
+        return {}
+    rows = db.session.execute(
+        select(StandardSkillAlias.alias, StandardSkillAlias.standard_skill_id).where(StandardSkillAlias.alias.in_(keys))
+    ).all()
+    return dict(rows)
+
+
+def _existing_names(keys):
+    if not keys:
+        return set()
+    return set(db.session.scalars(select(StandardSkill.normalized_name).where(StandardSkill.normalized_name.in_(keys))))
+
+
+def _upsert_skills(rows):
+    """
+    Inserta o actualiza las habilidades por normalized_name. Devuelve ({normalized_name: id}, insertadas)
+    solo con las filas insertadas o modificadas.
+    """
+    table = StandardSkill.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['normalized_name'],
+        set_={
+            'display_name': stmt.excluded.display_name,
+            'skill_type_id': func.coalesce(stmt.excluded.skill_type_id, table.c.skill_type_id),
+        },
+        # Las filas sin cambios no se reescriben ni se devuelven
+        where=or_(
+            table.c.display_name.is_distinct_from(stmt.excluded.display_name),
+            table.c.skill_type_id.is_distinct_from(func.coalesce(stmt.excluded.skill_type_id, table.c.skill_type_id))
+        )
+    ).returning(table.c.id, table.c.normalized_name, literal_column('xmax = 0').label('inserted'))
+    ids, inserted = {}, 0
+    for skill_id, name, was_inserted in db.session.execute(stmt, rows):
+        ids[name] = skill_id
+        inserted += bool(was_inserted)
+    return ids, inserted
+
+
+def _insert_aliases(rows):
+    if not rows:
+        return 0
+    stmt = insert(StandardSkillAlias.__table__).values(rows).on_conflict_do_nothing(index_elements=['alias'])
+    return db.session.execute(stmt).rowcount
+
+
+def load_catalog(entries, batch_size=CATALOG_BATCH_SIZE, default_type=None):
+    """
+    Carga un catálogo de habilidades en lotes: normaliza nombres y alias, descarta duplicados del archivo,
+    trata como alias los nombres que ya son variantes de otra habilidad y hace upsert por conjunto.
+    Cada lote con cambios incrementa la versión de 'standard_skills' en la misma transacción que lo confirma,
+    así una carga interrumpida no deja filas nuevas sin invalidar las cachés; al final emite reference_data_changed.
+    """
+    stats = {'read': 0, 'inserted': 0, 'updated': 0, 'aliases': 0, 'duplicates': 0, 'skipped': 0, 'errors': []}
+    types = skill_type_ids()
+    default_type_id = types.get(type_key(default_type)) if default_type else None
+    seen = set()
+    file_aliases = {}  # alias normalizado -> nombre normalizado de su habilidad en este archivo
+    file_ids = {}  # nombre normalizado -> id de las habilidades cargadas desde este archivo
+
+    entries = iter(entries)
+    try:
+        while True:
+            batch = list(islice(entries, batch_size))
+            if not batch:
+                break
+            names, aliases = _normalize_batch(batch)
+            known_aliases = _existing_aliases(set(names) | {a for group in aliases for a in group})
+
+            skill_rows = []
+            pending_aliases = []  # (alias, nombre normalizado o id existente)
+            for entry, key, entry_aliases in zip(batch, names, aliases):
+                stats['read'] += 1
+                if entry.get('error') or not key:
+                    stats['skipped'] += 1
+                    if len(stats['errors']) < MAX_REPORTED_ERRORS:
+                        stats['errors'].append({'record': stats['read'], 'error': entry.get('error') or 'Nombre vacío'})
+                    continue
+                # Un nombre que ya es variante de otra habilidad se agrega como alias de esa habilidad
+                target = known_aliases.get(key) or file_aliases.get(key)
+                if key in seen or target:
+                    stats['duplicates'] += 1
+                    if target and key not in seen:
+                        pending_aliases.extend((alias, target) for alias in entry_aliases if alias and alias != key)
+                    continue
+                seen.add(key)
+                skill_type = type_key(entry['type']) if entry['type'] else None
+                skill_rows.append({
+                    'normalized_name': key,
+                    'display_name': entry['name'][:MAX_NAME_LENGTH],
+                    'skill_type_id': types.get(skill_type, default_type_id) if skill_type else default_type_id,
+                })
+                for alias in entry_aliases:
+                    if alias and alias != key:
+                        file_aliases.setdefault(alias, key)
+                        pending_aliases.append((alias, key))
+
+            ids, inserted = _upsert_skills(skill_rows) if skill_rows else ({}, 0)
+            stats['inserted'] += inserted
+            stats['updated'] += len(ids) - inserted
+            file_ids.update(ids)
+            unchanged = [row['normalized_name'] for row in skill_rows if row['normalized_name'] not in ids]
+            if unchanged:
+                file_ids.update(db.session.execute(
+                    select(StandardSkill.normalized_name, StandardSkill.id).where(StandardSkill.normalized_name.in_(unchanged))
+                ).all())
+
+            # Los alias que son el nombre principal de otra habilidad no se registran
+            canonical = _existing_names({alias for alias, _ in pending_aliases})
+            alias_rows, batch_seen = [], set()
+            for alias, target in pending_aliases:
+                skill_id = target if isinstance(target, int) else file_ids.get(target)
+                if skill_id is None or alias in canonical or alias in batch_seen or alias in known_aliases:
+                    continue
+                batch_seen.add(alias)
+                alias_rows.append({'alias': alias, 'standard_skill_id': skill_id})
+            batch_aliases = _insert_aliases(alias_rows)
+            stats['aliases'] += batch_aliases
+            if ids or batch_aliases:
+                stats['version'] = bump_version(CATALOG)
+            db.session.commit()
+    finally:
+        if 'version' in stats:
+            reference_data_changed.send(CATALOG)
+    return stats
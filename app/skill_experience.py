@@ -0,0 +1,221 @@
+import re
+from collections import defaultdict
+from datetime import date, datetime
+from sqlalchemy import select, delete, insert, union, union_all, cast, func, literal, false, Date, Integer
+from sqlalchemy.orm import selectinload
+from app import db
+from app.models import Profile, StandardSkill, StandardSkillAlias, ProfileSkillExperience
+from app.job_postings import experience_interval, merged_months
+from app.reference_cache import get_reference_cache
+from app.utils import normalize_skill_name
+
+# Palabras, incluidos nombres como "c++", "c#", "node.js" o "ci/cd"
+_TOKENS = re.compile(r'[\w+#./\-]+')
+MAX_NGRAM = 4
+# Nombres de una letra ("c", "r") generan demasiados falsos positivos en texto libre
+MIN_NAME_LENGTH = 2
+
+class SkillMatcher:
+    """
+    Encuentra habilidades del catálogo standard_skills mencionadas en texto libre, buscando los
+    n-gramas normalizados del texto entre los normalized_name y los alias del catálogo.
+    """
+
+    def __init__(self, lookup):
+        # lookup(claves) -> {clave: standard_skill_id} con las claves que están en el catálogo
+        self.lookup = lookup
+
+    def find(self, text):
+        """Ids de las habilidades mencionadas en el texto."""
+        tokens = [token.strip('.-/') for token in _TOKENS.findall((text or '').lower())]
+        tokens = [token for token in tokens if token]
+        keys = set()
+        for i in range(len(tokens)):
+            for size in range(1, min(MAX_NGRAM, len(tokens) - i) + 1):
+                key = normalize_skill_name(' '.join(tokens[i:i + size]))
+                if len(key) >= MIN_NAME_LENGTH:
+                    keys.add(key)
+        return set(self.lookup(keys).values()) if keys else set()
+
+
+def lookup_database(keys):
+    """Búsqueda de lookup_skills en standard_skills y standard_skill_aliases (índices únicos)."""
+    keys = list(keys)
+    # Los alias se cargan primero para que un nombre principal tenga prioridad sobre una variante igual
+    found = dict(db.session.execute(
+        select(StandardSkillAlias.alias, StandardSkillAlias.standard_skill_id).where(StandardSkillAlias.alias.in_(keys))
+    ).all())
+    found.update(db.session.execute(
+        select(StandardSkill.normalized_name, StandardSkill.id).where(StandardSkill.normalized_name.in_(keys))
+    ).all())
+    return found
+
+
+def lookup_skills(keys):
+    """
+    Busca las claves en el catálogo de la caché de datos de referencia, que se recarga cuando cambia la
+    versión del catálogo; si el catálogo no entra en el límite de memoria, en la base de datos.
+    """
+    found = get_reference_cache().lookup_skills(keys)
+    return found if found is not None else lookup_database(keys)
+
+
+_matcher = SkillMatcher(lookup_skills)
+
+
+def get_skill_matcher():
+    """Matcher del catálogo vigente."""
+    return _matcher
+
+
+def _split_ongoing(spans, today):
+    """
+    Separa el período continuo que llega hasta hoy. Devuelve (meses de los períodos cerrados, inicio del
+    período en curso o None).
+    """
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    if merged[-1][1] >= today:
+        start, _ = merged.pop()
+        return merged_months(merged), start
+    return merged_months(merged), None
+
+
+def _month_index(value):
+    return value.year * 12 + value.month - 1
+
+
+def _month_start(index):
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def compute_skill_experience(work_experiences, matcher, today=None):
+    """
+    Agrega por habilidad los meses de experiencia (sin solapamientos), la fecha de último uso, si se usa
+    en el trabajo actual y, si el uso llega hasta hoy, el ancla desde la que se cuentan sus meses
+    (ver ProfileSkillExperience). Devuelve {standard_skill_id: (total_months, last_used, is_current, months_anchor)}.
+    """
+    today = today or date.today()
+    intervals = defaultdict(list)
+    current = set()
+    for exp in work_experiences:
+        interval = experience_interval(exp, today)
+        if not interval:
+            continue
+        for skill_id in matcher.find(f'{exp.position or ""}\n{exp.description or ""}'):
+            intervals[skill_id].append(interval)
+            if exp.current_job:
+                current.add(skill_id)
+    aggregates = {}
+    for skill_id, spans in intervals.items():
+        months, ongoing_since = _split_ongoing(spans, today)
+        anchor = _month_start(_month_index(ongoing_since) - months) if ongoing_since else None
+        aggregates[skill_id] = (months, max(end for _, end in spans), skill_id in current, anchor)
+    return aggregates
+
+
+def rebuild_profile_skill_experience(profile, matcher=None, today=None):
+    """
+    Reemplaza las filas de profile_skill_experience del perfil. No confirma la transacción.
+    """
+    aggregates = compute_skill_experience(profile.work_experiences, matcher or get_skill_matcher(), today)
+    table = ProfileSkillExperience.__table__
+    db.session.execute(delete(table).where(table.c.profile_id == profile.id))
+    if aggregates:
+        now = datetime.utcnow()
+        db.session.execute(insert(table), [
+            {'profile_id': profile.id, 'standard_skill_id': skill_id, 'total_months': months,
+             'last_used': last_used, 'is_current': is_current, 'months_anchor': anchor, 'updated_at': now}
+            for skill_id, (months, last_used, is_current, anchor) in aggregates.items()
+        ])
+    return len(aggregates)
+
+
+def rebuild_all_skill_experience(batch_size=500):
+    """
+    Recalcula el índice de todos los perfiles, confirmando por lotes. Necesario tras cambiar el catálogo.
+    """
+    # Recarga el catálogo en memoria sin esperar a la próxima comprobación de versión
+    get_reference_cache().invalidate()
+    matcher = get_skill_matcher()
+    last_id = 0
+    profiles = rows = 0
+    while True:
+        batch = Profile.query.options(selectinload(Profile.work_experiences)).filter(
+            Profile.id > last_id
+        ).order_by(Profile.id).limit(batch_size).all()
+        if not batch:
+            break
+        for profile in batch:
+            rows += rebuild_profile_skill_experience(profile, matcher)
+        profiles += len(batch)
+        last_id = batch[-1].id
+        db.session.commit()
+        db.session.expunge_all()
+    return {'profiles': profiles, 'rows': rows}
+
+
+def experience_query(skill_ids, min_months=0, current=None, used_since=None, limit=50, today=None):
+    """
+    Consulta de search_by_experience: filas (profile_id, user_id, months, last_used, is_current) con los
+    meses y el último uso a la fecha. Los períodos cerrados se filtran y ordenan por total_months y los que
+    siguen en uso por months_anchor, cada rama con su índice parcial; se unen los primeros `limit` de cada una.
+    """
+    today = today or date.today()
+    table = ProfileSkillExperience
+    anchor = table.months_anchor
+    # Meses calendario desde el ancla, con la misma cuenta que _months_between de app/job_postings.py
+    ongoing_months = _month_index(today) - (
+        cast(func.date_part('year', anchor), Integer) * 12 + cast(func.date_part('month', anchor), Integer) - 1)
+
+    closed = select(
+        table.profile_id, table.total_months.label('months'), table.last_used, table.is_current
+    ).where(table.standard_skill_id.in_(skill_ids), anchor.is_(None))
+    ongoing = select(
+        table.profile_id, ongoing_months.label('months'), cast(literal(today), Date).label('last_used'), table.is_current
+    ).where(table.standard_skill_id.in_(skill_ids), anchor.isnot(None))
+    if min_months:
+        closed = closed.where(table.total_months >= min_months)
+        ongoing = ongoing.where(anchor <= _month_start(_month_index(today) - min_months))
+    if current is not None:
+        closed = closed.where(table.is_current.is_(current))
+        ongoing = ongoing.where(table.is_current.is_(current))
+    if used_since is not None:
+        closed = closed.where(table.last_used >= used_since)
+        if used_since > today:
+            ongoing = ongoing.where(false())
+    closed = closed.order_by(table.total_months.desc()).limit(limit).subquery()
+    ongoing = ongoing.order_by(anchor).limit(limit).subquery()
+
+    rows = union_all(select(closed), select(ongoing)).subquery()
+    return select(rows.c.profile_id, Profile.user_id, rows.c.months, rows.c.last_used, rows.c.is_current).join(
+        Profile, Profile.id == rows.c.profile_id
+    ).order_by(rows.c.months.desc(), rows.c.profile_id).limit(limit)
+
+
+def search_by_experience(skill, min_months=0, current=None, used_since=None, limit=50):
+    """
+    Perfiles con experiencia en la habilidad, de mayor a menor cantidad de meses.
+    Se resuelve con los índices de profile_skill_experience, sin leer las descripciones.
+    """
+    key = normalize_skill_name(skill)
+    skill_ids = union(
+        select(StandardSkill.id).where(StandardSkill.normalized_name == key),
+        select(StandardSkillAlias.standard_skill_id).where(StandardSkillAlias.alias == key)
+    )
+    query = experience_query(skill_ids, min_months, current, used_since, limit)
+    return [
+        {
+            'profile_id': row.profile_id,
+            'user_id': row.user_id,
+            'total_months': row.months,
+            'years': round(row.months / 12, 1),
+            'last_used': row.last_used.isoformat() if row.last_used else None,
+            'is_current': row.is_current,
+        }
+        for row in db.session.execute(query).all()
+    ]
@@ -0,0 +1,42 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Módulos que no deben cargarse al crear la app; se importan en el primer uso
+HEAVY_MODULES = ('google.generativeai', 'pdfkit', 'docx')
+
+_MEASURE = """
+import json, resource, sys, time
+start = time.perf_counter()
+from app import create_app
+create_app()
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'ms': elapsed * 1000,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'heavy': [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def measure_startup(project_root, runs=5):
+    """
+    Mide en procesos nuevos el tiempo de importar app y ejecutar create_app(), y la memoria máxima
+    del proceso. Devuelve la mediana de tiempo, el máximo de memoria y los módulos pesados cargados.
+    """
+    samples = []
+    env = dict(os.environ, PRELOAD_SUBSYSTEMS='')
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', _MEASURE], cwd=project_root, env=env,
+            capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    return {
+        'ms': statistics.median(s['ms'] for s in samples),
+        'max_rss_mb': max(s['max_rss_mb'] for s in samples),
+        'heavy': sorted({name for s in samples for name in s['heavy']}),
+    }
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from app.models import (User, Profile, WorkExperience, Education, Language, Certificate, SkillCategory,
+                        Resume, JobApplication, Postulacion, SyncTombstone)
+from app.serializers import columns_schema
+
+# entidad -> modelo; los hijos del perfil se filtran por profile_id y el resto por el usuario
+PROFILE_CHILDREN = {
+    'work_experience': WorkExperience,
+    'education': Education,
+    'language': Language,
+    'certificate': Certificate,
+    'skill_category': SkillCategory,
+}
+USER_CHILDREN = {
+    'resume': (Resume, Resume.user_id),
+    'job_application': (JobApplication, JobApplication.user_id),
+    'postulacion': (Postulacion, Postulacion.usuario_id),
+}
+ENTITY_NAMES = {model: name for name, model in PROFILE_CHILDREN.items()}
+ENTITY_NAMES.update({model: name for name, (model, _) in USER_CHILDREN.items()})
+ENTITY_NAMES[Profile] = 'profile'
+
+SCHEMAS = {model: columns_schema(model) for model in ENTITY_NAMES}
+SCHEMAS[User] = columns_schema(User, exclude=('password_hash',))
+
+
+class CursorExpiredError(Exception):
+    pass
+
+
+def _owner_id(obj):
+    if isinstance(obj, Profile):
+        return obj.user_id
+    if hasattr(obj, 'profile_id'):
+        return obj.profile.user_id if obj.profile else None
+    return obj.usuario_id if isinstance(obj, Postulacion) else obj.user_id
+
+
+def _record_tombstones(session, flush_context, instances):
+    for obj in session.deleted:
+        entity = ENTITY_NAMES.get(type(obj))
+        if entity and obj.id is not None:
+            user_id = _owner_id(obj)
+            if user_id is not None:
+                session.add(SyncTombstone(user_id=user_id, entity=entity, entity_id=obj.id))
+
+
+def register_listeners():
+    """
+    Guarda una lápida por cada entidad sincronizable borrada a través del ORM.
+    """
+    if not event.contains(Session, 'before_flush', _record_tombstones):
+        event.listen(Session, 'before_flush', _record_tombstones)
+
+
+def parse_cursor(cursor):
+    """
+    Convierte el cursor (ISO 8601) a UTC sin zona horaria, como updated_at. Lanza ValueError si es inválido.
+    """
+    if not cursor:
+        return None
+    since = datetime.fromisoformat(cursor)
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since
+
+
+def get_changes(user_id, since, overlap_seconds=5, retention_days=30):
+    """
+    Devuelve las entidades del usuario creadas o modificadas después de `since` y los ids borrados.
+    Sin cursor devuelve todo. La ventana de solapamiento cubre transacciones que se confirman
+    con un updated_at anterior al cursor; el cliente aplica los cambios de forma idempotente por id.
+    """
+    now = datetime.utcnow()
+    if since is not None and since < now - timedelta(days=retention_days):
+        raise CursorExpiredError()
+    window = since - timedelta(seconds=overlap_seconds) if since else None
+
+    def changed(query, model):
+        if window is not None:
+            query = query.filter(model.updated_at > window)
+        return SCHEMAS[model].dump_many(query.all())
+
+    changes = {'user': changed(User.query.filter(User.id == user_id), User)}
+    profile = Profile.query.filter_by(user_id=user_id).first()
+    changes['profile'] = changed(Profile.query.filter(Profile.id == profile.id), Profile) if profile else []
+    for name, model in PROFILE_CHILDREN.items():
+        changes[name] = changed(model.query.filter(model.profile_id == profile.id), model) if profile else []
+    for name, (model, owner_column) in USER_CHILDREN.items():
+        changes[name] = changed(model.query.filter(owner_column == user_id), model)
+
+    deleted = {}
+    if window is not None:
+        tombstones = SyncTombstone.query.filter(
+            SyncTombstone.user_id == user_id,
+            SyncTombstone.deleted_at > window
+        ).all()
+        for tombstone in tombstones:
+            deleted.setdefault(tombstone.entity, []).append(tombstone.entity_id)
+
+    return {'cursor': now.isoformat(), 'changes': changes, 'deleted': deleted}
+
+
+def prune_tombstones(retention_days=30):
+    deleted = SyncTombstone.query.filter(
+        SyncTombstone.deleted_at < datetime.utcnow() - timedelta(days=retention_days)
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
@@ -0,0 +1,238 @@
+import contextvars
+import importlib
+import json
+import logging
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Hijo del logger de la app Flask ("app"), disponible también fuera de un contexto de aplicación
+logger = logging.getLogger(__name__)
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+
+class Span:
+    def __init__(self, name, trace_id, parent, sampled, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent = parent
+        self.parent_id = parent.span_id if isinstance(parent, Span) else parent
+        self.sampled = sampled
+        self.attributes = dict(attributes or {})
+        self.events = []
+        self.status = 'ok'
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def increment(self, key, amount=1):
+        # Los contadores (p. ej. db.query_count) se acumulan también en los spans padres
+        span = self
+        while isinstance(span, Span):
+            span.attributes[key] = span.attributes.get(key, 0) + amount
+            span = span.parent
+
+    def add_event(self, name, **attributes):
+        self.events.append({'name': name, 'time': time.time(), 'attributes': attributes})
+
+    def set_error(self, error):
+        self.status = 'error'
+        self.attributes['error.type'] = type(error).__name__
+        self.attributes['error.message'] = str(error)
+
+    def end(self):
+        if self.duration_ms is None:
+            self.duration_ms = (time.perf_counter() - self._start) * 1000
+
+    @property
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_time': self.start_time,
+            'duration_ms': round(self.duration_ms or 0, 3),
+            'status': self.status,
+            'attributes': self.attributes,
+            'events': self.events,
+        }
+
+
+class _NoopSpan:
+    """Span vacío que se usa cuando el tracing está deshabilitado."""
+    sampled = False
+    traceparent = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def increment(self, key, amount=1):
+        pass
+
+    def add_event(self, name, **attributes):
+        pass
+
+    def set_error(self, error):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class ConsoleExporter:
+    def export(self, span):
+        print(json.dumps(span.to_dict(), default=str, ensure_ascii=False), file=sys.stderr)
+
+
+class FileExporter:
+    """Escribe cada span como una línea JSON en un archivo local."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        line = json.dumps(span.to_dict(), default=str, ensure_ascii=False) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as out:
+                out.write(line)
+
+
+class Tracer:
+    def __init__(self):
+        self.exporter = None
+        self.sample_rate = 1.0
+
+    def configure(self, exporter, sample_rate):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    @property
+    def enabled(self):
+        return self.exporter is not None
+
+    def start_span(self, name, traceparent=None, **attributes):
+        """
+        Abre un span hijo del actual. Sin span actual inicia una traza nueva, continuando la del
+        encabezado W3C `traceparent` si viene en la petición. Devuelve (span, token).
+        """
+        if not self.enabled:
+            return NOOP_SPAN, None
+        parent = _current_span.get()
+        if isinstance(parent, Span):
+            span = Span(name, parent.trace_id, parent, parent.sampled, attributes)
+        else:
+            match = _TRACEPARENT.match(traceparent or '')
+            if match:
+                trace_id, parent_id, flags = match.groups()
+                span = Span(name, trace_id, parent_id, int(flags, 16) & 1 == 1, attributes)
+            else:
+                span = Span(name, secrets.token_hex(16), None, random.random() < self.sample_rate, attributes)
+        return span, _current_span.set(span)
+
+    def end_span(self, span, token, error=None):
+        if token is None:
+            return
+        if error is not None:
+            span.set_error(error)
+        span.end()
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # El span se cerró en otro contexto (p. ej. al terminar una respuesta en streaming)
+            _current_span.set(span.parent if isinstance(span.parent, Span) else None)
+        if span.sampled:
+            try:
+                self.exporter.export(span)
+            except Exception:
+                logger.exception("Error al exportar span")
+
+    @contextmanager
+    def span(self, name, **attributes):
+        span, token = self.start_span(name, **attributes)
+        try:
+            yield span
+        except Exception as e:
+            self.end_span(span, token, error=e)
+            raise
+        self.end_span(span, token)
+
+
+tracer = Tracer()
+
+
+def current_span():
+    return _current_span.get() or NOOP_SPAN
+
+
+def _load_exporter(app):
+    name = app.config.get('TRACE_EXPORTER') or 'none'
+    if name == 'none':
+        return None
+    if name == 'console':
+        return ConsoleExporter()
+    if name == 'file':
+        return FileExporter(app.config['TRACE_FILE'])
+    # Exportador propio: "paquete.modulo:Clase", construido con la app
+    module_name, _, class_name = name.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)(app)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    span = _current_span.get()
+    if span is not None:
+        span.increment('db.query_count')
+
+
+def init_tracing(app):
+    """
+    Configura el exportador y el muestreo, abre un span por petición y cuenta las consultas SQL.
+    """
+    tracer.configure(_load_exporter(app), app.config.get('TRACE_SAMPLE_RATE', 1.0))
+    if not tracer.enabled:
+        return
+
+    if not event.contains(Engine, 'before_cursor_execute', _count_query):
+        event.listen(Engine, 'before_cursor_execute', _count_query)
+
+    @app.before_request
+    def start_request_span():
+        span, token = tracer.start_span(
+            f'{request.method} {request.url_rule.rule if request.url_rule else request.path}',
+            traceparent=request.headers.get('traceparent'),
+            **{'http.method': request.method, 'http.path': request.path}
+        )
+        g.trace_span, g.trace_token = span, token
+
+    @app.after_request
+    def add_trace_header(response):
+        span = g.get('trace_span')
+        if span is not None:
+            span.set_attribute('http.status_code', response.status_code)
+            if span.sampled:
+                response.headers['traceparent'] = span.traceparent
+        return response
+
+    @app.teardown_request
+    def end_request_span(error=None):
+        span = g.pop('trace_span', None)
+        if span is not None:
+            tracer.end_span(span, g.pop('trace_token', None), error=error)
@@ -0,0 +1,34 @@
+import hmac
+import re
+from functools import wraps
+from flask import current_app, jsonify, request
+
+# IDs de skill_types usados por convención en las rutas
+TECH_SKILL_TYPE_ID = 1
+SOFT_SKILL_TYPE_ID = 2
+
+_SEPARATORS = re.compile(r'[\s\-/]+')
+_INVALID_CHARS = re.compile(r'[^\w+#_]')
+
+
+def normalize_skill_name(name):
+    """
+    Normaliza el nombre de una habilidad al formato de standard_skills.normalized_name ("React.js" -> "reactjs").
+    """
+    name = _SEPARATORS.sub('_', str(name).strip().lower())
+    return _INVALID_CHARS.sub('', name).strip('_')
+
+
+def admin_token_required(view):
+    """
+    Protege endpoints de administración (importaciones, exportaciones masivas) con el token ADMIN_API_TOKEN.
+    Si el token no está configurado el endpoint queda deshabilitado.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        expected = current_app.config.get('ADMIN_API_TOKEN')
+        received = request.headers.get('X-Admin-Token', '')
+        if not expected or not hmac.compare_digest(expected, received):
+            return jsonify({'message': 'No autorizado'}), 403
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,178 @@
+"""Esquema inicial
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('email', sa.String(length=100), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('preferred_language', sa.String(length=10), nullable=True),
+        sa.Column('dark_theme', sa.Boolean(), nullable=True),
+        sa.Column('email_notifications', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email')
+    )
+    op.create_table('skill_types',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_table('profiles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('linkedin_url', sa.Text(), nullable=True),
+        sa.Column('github_url', sa.Text(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('headline', sa.String(length=255), nullable=True),
+        sa.Column('availability_status', sa.String(length=50), nullable=True),
+        sa.Column('preferred_work_type', sa.String(length=20), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id')
+    )
+    op.create_table('resumes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('category', sa.String(length=50), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('file_url', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('postulaciones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('nombre_cargo', sa.String(length=200), nullable=False),
+        sa.Column('empresa', sa.String(length=200), nullable=True),
+        sa.Column('link', sa.String(length=500), nullable=True),
+        sa.Column('descripcion', sa.Text(), nullable=True),
+        sa.Column('estado', sa.String(length=50), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('standard_skills',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('normalized_name', sa.String(length=100), nullable=True),
+        sa.Column('display_name', sa.String(length=100), nullable=True),
+        sa.Column('skill_type_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['skill_type_id'], ['skill_types.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('normalized_name')
+    )
+    op.create_table('job_applications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('resume_id', sa.Integer(), nullable=False),
+        sa.Column('company', sa.String(length=100), nullable=False),
+        sa.Column('position', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('job_url', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('match_percentage', sa.Integer(), nullable=True),
+        sa.Column('application_deadline', sa.Date(), nullable=True),
+        sa.Column('source', sa.String(length=50), nullable=True),
+        sa.ForeignKeyConstraint(['resume_id'], ['resumes.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('work_experience',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('profile_id', sa.Integer(), nullable=False),
+        sa.Column('company', sa.String(length=100), nullable=False),
+        sa.Column('position', sa.String(length=100), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('current_job', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('education',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('profile_id', sa.Integer(), nullable=False),
+        sa.Column('institution', sa.String(length=100), nullable=False),
+        sa.Column('degree', sa.String(length=100), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('languages',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('profile_id', sa.Integer(), nullable=False),
+        sa.Column('language', sa.String(length=50), nullable=False),
+        sa.Column('level', sa.String(length=20), nullable=False),
+        sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('skills',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('profile_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('type', sa.String(length=20), nullable=False),
+        sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('certificates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('profile_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('institution', sa.String(length=100), nullable=False),
+        sa.Column('date', sa.Date(), nullable=True),
+        sa.Column('url', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('skill_categories',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('profile_id', sa.Integer(), nullable=False),
+        sa.Column('skill_type_id', sa.Integer(), nullable=False),
+        sa.Column('skills', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+        sa.ForeignKeyConstraint(['skill_type_id'], ['skill_types.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('skill_categories')
+    op.drop_table('certificates')
+    op.drop_table('skills')
+    op.drop_table('languages')
+    op.drop_table('education')
+    op.drop_table('work_experience')
+    op.drop_table('job_applications')
+    op.drop_table('standard_skills')
+    op.drop_table('postulaciones')
+    op.drop_table('resumes')
+    op.drop_table('profiles')
+    op.drop_table('skill_types')
+    op.drop_table('users')
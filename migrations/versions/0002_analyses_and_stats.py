@@ -0,0 +1,53 @@
+"""Tablas cv_analyses y application_stats
+
+Revision ID: 0002_analyses_and_stats
+Revises: 0001_baseline
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0002_analyses_and_stats'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cv_analyses',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('resume_id', sa.Integer(), nullable=False),
+        sa.Column('job_application_id', sa.Integer(), nullable=True),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('job_title', sa.String(length=200), nullable=True),
+        sa.Column('job_description', sa.Text(), nullable=True),
+        sa.Column('profile_data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('ai_data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['job_application_id'], ['job_applications.id'], ),
+        sa.ForeignKeyConstraint(['resume_id'], ['resumes.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('resume_id', 'version')
+    )
+    op.create_table('application_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('dimension', sa.String(length=30), nullable=False),
+        sa.Column('value', sa.String(length=200), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('match_sum', sa.Integer(), nullable=False),
+        sa.Column('match_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'kind', 'dimension', 'value')
+    )
+
+
+def downgrade():
+    op.drop_table('application_stats')
+    op.drop_table('cv_analyses')
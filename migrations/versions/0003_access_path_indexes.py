@@ -0,0 +1,70 @@
+"""Índices de claves foráneas y caminos de acceso usados por las rutas
+
+Revision ID: 0003_access_path_indexes
+Revises: 0002_analyses_and_stats
+Create Date: 2026-10-19 09:20:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0003_access_path_indexes'
+down_revision = '0002_analyses_and_stats'
+branch_labels = None
+depends_on = None
+
+# (tabla, columna): filtros por dueño en las rutas y borrados en cascada
+FOREIGN_KEY_INDEXES = [
+    ('work_experience', 'profile_id'),
+    ('education', 'profile_id'),
+    ('languages', 'profile_id'),
+    ('certificates', 'profile_id'),
+    ('skills', 'profile_id'),
+    ('resumes', 'user_id'),
+    ('postulaciones', 'usuario_id'),
+    ('job_applications', 'user_id'),
+    ('job_applications', 'resume_id'),
+    ('cv_analyses', 'user_id'),
+    ('cv_analyses', 'job_application_id'),
+    ('standard_skills', 'skill_type_id'),
+]
+
+
+def upgrade():
+    for table, column in FOREIGN_KEY_INDEXES:
+        op.create_index(f'ix_{table}_{column}', table, [column])
+
+    # Unificar categorías duplicadas antes de crear el índice único (se conserva la de menor id)
+    op.execute("""
+        UPDATE skill_categories AS keep
+        SET skills = merged.skills
+        FROM (
+            SELECT min(sc.id) AS keep_id, jsonb_agg(DISTINCT elem) AS skills
+            FROM skill_categories sc, jsonb_array_elements(coalesce(sc.skills, '[]'::jsonb)) AS elem
+            GROUP BY sc.profile_id, sc.skill_type_id
+            HAVING count(DISTINCT sc.id) > 1
+        ) AS merged
+        WHERE keep.id = merged.keep_id
+    """)
+    op.execute("""
+        DELETE FROM skill_categories a
+        USING skill_categories b
+        WHERE a.profile_id = b.profile_id
+          AND a.skill_type_id = b.skill_type_id
+          AND a.id > b.id
+    """)
+    op.create_index('ix_skill_categories_profile_skill_type', 'skill_categories', ['profile_id', 'skill_type_id'], unique=True)
+
+    # search_skills filtra con ILIKE '%texto%', que solo puede usar un índice de trigramas
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_standard_skills_normalized_name_trgm', 'standard_skills', ['normalized_name'],
+        postgresql_using='gin', postgresql_ops={'normalized_name': 'gin_trgm_ops'}
+    )
+
+
+def downgrade():
+    op.drop_index('ix_standard_skills_normalized_name_trgm', table_name='standard_skills')
+    op.drop_index('ix_skill_categories_profile_skill_type', table_name='skill_categories')
+    for table, column in reversed(FOREIGN_KEY_INDEXES):
+        op.drop_index(f'ix_{table}_{column}', table_name=table)
@@ -0,0 +1,41 @@
+"""updated_at en tablas hijas y lápidas de borrado para el feed de cambios
+
+Revision ID: 0004_sync_change_tracking
+Revises: 0003_access_path_indexes
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0004_sync_change_tracking'
+down_revision = '0003_access_path_indexes'
+branch_labels = None
+depends_on = None
+
+TABLES = ['work_experience', 'education', 'languages', 'certificates', 'skill_categories', 'postulaciones']
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        # Las filas existentes se entregan una vez a los clientes que ya tienen cursor
+        op.execute(f"UPDATE {table} SET updated_at = timezone('utc', now())")
+
+    op.create_table('sync_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(length=30), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_tombstones_user_deleted_at', 'sync_tombstones', ['user_id', 'deleted_at'])
+
+
+def downgrade():
+    op.drop_index('ix_sync_tombstones_user_deleted_at', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
+    for table in reversed(TABLES):
+        op.drop_column(table, 'updated_at')
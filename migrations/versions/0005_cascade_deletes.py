@@ -0,0 +1,62 @@
+"""ON DELETE CASCADE en claves foráneas y marca de borrado de cuentas
+
+Revision ID: 0005_cascade_deletes
+Revises: 0004_sync_change_tracking
+Create Date: 2026-10-19 09:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0005_cascade_deletes'
+down_revision = '0004_sync_change_tracking'
+branch_labels = None
+depends_on = None
+
+# (tabla, columna, tabla referenciada, acción); los nombres siguen la convención de PostgreSQL
+FOREIGN_KEYS = [
+    ('profiles', 'user_id', 'users', 'CASCADE'),
+    ('resumes', 'user_id', 'users', 'CASCADE'),
+    ('postulaciones', 'usuario_id', 'users', 'CASCADE'),
+    ('job_applications', 'user_id', 'users', 'CASCADE'),
+    ('job_applications', 'resume_id', 'resumes', 'CASCADE'),
+    ('cv_analyses', 'user_id', 'users', 'CASCADE'),
+    ('cv_analyses', 'resume_id', 'resumes', 'CASCADE'),
+    ('cv_analyses', 'job_application_id', 'job_applications', 'SET NULL'),
+    ('work_experience', 'profile_id', 'profiles', 'CASCADE'),
+    ('education', 'profile_id', 'profiles', 'CASCADE'),
+    ('languages', 'profile_id', 'profiles', 'CASCADE'),
+    ('skills', 'profile_id', 'profiles', 'CASCADE'),
+    ('certificates', 'profile_id', 'profiles', 'CASCADE'),
+    ('skill_categories', 'profile_id', 'profiles', 'CASCADE'),
+]
+
+
+def _recreate(table, column, referent, ondelete):
+    # NOT VALID: la clave nueva no revisa las filas existentes mientras se tiene ACCESS EXCLUSIVE sobre la tabla
+    name = f'{table}_{column}_fkey'
+    op.drop_constraint(name, table, type_='foreignkey')
+    op.create_foreign_key(name, table, referent, [column], ['id'], ondelete=ondelete, postgresql_not_valid=True)
+
+
+def _validate():
+    # Fuera de la transacción de la migración: VALIDATE CONSTRAINT solo toma SHARE UPDATE EXCLUSIVE
+    # y no bloquea lecturas ni escrituras mientras recorre las tablas
+    with op.get_context().autocommit_block():
+        for table, column, _, _ in FOREIGN_KEYS:
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {table}_{column}_fkey')
+
+
+def upgrade():
+    for table, column, referent, ondelete in FOREIGN_KEYS:
+        _recreate(table, column, referent, ondelete)
+    op.add_column('users', sa.Column('deletion_requested_at', sa.DateTime(), nullable=True))
+    _validate()
+
+
+def downgrade():
+    op.drop_column('users', 'deletion_requested_at')
+    for table, column, referent, _ in reversed(FOREIGN_KEYS):
+        _recreate(table, column, referent, None)
+    _validate()
@@ -0,0 +1,49 @@
+"""Tabla job_postings con los requisitos analizados de cada descripción de puesto
+
+Revision ID: 0006_job_postings
+Revises: 0005_cascade_deletes
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0006_job_postings'
+down_revision = '0005_cascade_deletes'
+branch_labels = None
+depends_on = None
+
+LINKED_TABLES = ['postulaciones', 'job_applications']
+
+
+def upgrade():
+    op.create_table('job_postings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=True),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('requirements', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('seniority', sa.String(length=30), nullable=True),
+        sa.Column('parser_version', sa.Integer(), nullable=True),
+        sa.Column('parsed_at', sa.DateTime(), nullable=True),
+        sa.Column('parse_failures', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('parse_failed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('content_hash')
+    )
+    for table in LINKED_TABLES:
+        op.add_column(table, sa.Column('job_posting_id', sa.Integer(), nullable=True))
+        op.create_foreign_key(f'{table}_job_posting_id_fkey', table, 'job_postings',
+                              ['job_posting_id'], ['id'], ondelete='SET NULL')
+        op.create_index(f'ix_{table}_job_posting_id', table, ['job_posting_id'])
+
+
+def downgrade():
+    for table in reversed(LINKED_TABLES):
+        op.drop_index(f'ix_{table}_job_posting_id', table_name=table)
+        op.drop_constraint(f'{table}_job_posting_id_fkey', table, type_='foreignkey')
+        op.drop_column(table, 'job_posting_id')
+    op.drop_table('job_postings')
@@ -0,0 +1,37 @@
+"""Cola rescore_queue, huellas de facetas y puntaje local de postulaciones
+
+Revision ID: 0007_rescore_queue
+Revises: 0006_job_postings
+Create Date: 2026-10-19 10:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0007_rescore_queue'
+down_revision = '0006_job_postings'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('job_applications', sa.Column('score_facets', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('job_applications', sa.Column('local_match_percentage', sa.Integer(), nullable=True))
+    op.create_table('rescore_queue',
+        sa.Column('profile_id', sa.Integer(), nullable=False),
+        sa.Column('facet', sa.String(length=30), nullable=False),
+        sa.Column('enqueued_at', sa.DateTime(), nullable=False),
+        sa.Column('due_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('profile_id', 'facet')
+    )
+    op.create_index('ix_rescore_queue_due_at', 'rescore_queue', ['due_at'])
+
+
+def downgrade():
+    op.drop_index('ix_rescore_queue_due_at', table_name='rescore_queue')
+    op.drop_table('rescore_queue')
+    op.drop_column('job_applications', 'local_match_percentage')
+    op.drop_column('job_applications', 'score_facets')
@@ -0,0 +1,47 @@
+"""Índice profile_skill_experience de experiencia por habilidad
+
+Revision ID: 0008_profile_skill_experience
+Revises: 0007_rescore_queue
+Create Date: 2026-10-19 10:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0008_profile_skill_experience'
+down_revision = '0007_rescore_queue'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('profile_skill_experience',
+        sa.Column('profile_id', sa.Integer(), nullable=False),
+        sa.Column('standard_skill_id', sa.Integer(), nullable=False),
+        sa.Column('total_months', sa.Integer(), nullable=False),
+        sa.Column('last_used', sa.Date(), nullable=True),
+        sa.Column('is_current', sa.Boolean(), nullable=False),
+        sa.Column('months_anchor', sa.Date(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['standard_skill_id'], ['standard_skills.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('profile_id', 'standard_skill_id')
+    )
+    op.create_index('ix_profile_skill_experience_skill_months', 'profile_skill_experience',
+                    ['standard_skill_id', 'total_months'], postgresql_where=sa.text('months_anchor IS NULL'))
+    op.create_index('ix_profile_skill_experience_skill_last_used', 'profile_skill_experience',
+                    ['standard_skill_id', 'last_used'], postgresql_where=sa.text('months_anchor IS NULL'))
+    op.create_index('ix_profile_skill_experience_skill_anchor', 'profile_skill_experience',
+                    ['standard_skill_id', 'months_anchor'], postgresql_where=sa.text('months_anchor IS NOT NULL'))
+    op.create_index('ix_profile_skill_experience_skill_current', 'profile_skill_experience',
+                    ['standard_skill_id'], postgresql_where=sa.text('is_current'))
+    # Las filas se calculan con: flask rebuild-skill-experience
+
+
+def downgrade():
+    op.drop_index('ix_profile_skill_experience_skill_current', table_name='profile_skill_experience')
+    op.drop_index('ix_profile_skill_experience_skill_anchor', table_name='profile_skill_experience')
+    op.drop_index('ix_profile_skill_experience_skill_last_used', table_name='profile_skill_experience')
+    op.drop_index('ix_profile_skill_experience_skill_months', table_name='profile_skill_experience')
+    op.drop_table('profile_skill_experience')
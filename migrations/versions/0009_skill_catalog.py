@@ -0,0 +1,39 @@
+"""Alias del catálogo de habilidades y contadores de versión de datos de referencia
+
+Revision ID: 0009_skill_catalog
+Revises: 0008_profile_skill_experience
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0009_skill_catalog'
+down_revision = '0008_profile_skill_experience'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('standard_skill_aliases',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('alias', sa.String(length=100), nullable=False),
+        sa.Column('standard_skill_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['standard_skill_id'], ['standard_skills.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('alias')
+    )
+    op.create_index('ix_standard_skill_aliases_standard_skill_id', 'standard_skill_aliases', ['standard_skill_id'])
+    op.create_table('reference_data_versions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('reference_data_versions')
+    op.drop_index('ix_standard_skill_aliases_standard_skill_id', table_name='standard_skill_aliases')
+    op.drop_table('standard_skill_aliases')
@@ -0,0 +1,17 @@
+import pytest
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """Aplicación mínima con la configuración por defecto y los singletons del proceso reiniciados."""
+    flask = pytest.importorskip('flask')
+    from app import nlp_utils, llm_scheduler, reference_cache
+    from config import Config
+
+    app = flask.Flask(__name__)
+    app.config.from_object(Config)
+    monkeypatch.setattr(nlp_utils, '_breaker', None)
+    monkeypatch.setattr(llm_scheduler, '_scheduler', None)
+    monkeypatch.setattr(reference_cache, '_cache', None)
+    with app.app_context():
+        yield app
@@ -0,0 +1,107 @@
+import time
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip('flask')
+
+from app.llm_scheduler import GeminiScheduler, QuotaExceededError, PRIORITIES, _Ticket
+from app.resilience import CircuitOpenError, DeadlineExceeded
+
+FAR = float('inf')
+
+
+class ResourceExhausted(Exception):
+    """Mismo nombre que google.api_core.exceptions.ResourceExhausted (HTTP 429)."""
+
+    def __init__(self, retry_after=None):
+        super().__init__('429')
+        self.retry_after = retry_after
+
+
+def scheduler(rpm=60, tpm=60000, user_rpm=60, user_tpm=60000):
+    return GeminiScheduler(rpm=rpm, tpm=tpm, user_rpm=user_rpm, user_tpm=user_tpm)
+
+
+def response(text='ok'):
+    return SimpleNamespace(text=text)
+
+
+def test_interactive_goes_before_earlier_batch():
+    s = scheduler()
+    batch = _Ticket(0, None, 10, PRIORITIES['batch'], FAR)
+    interactive = _Ticket(1, None, 10, PRIORITIES['interactive'], FAR)
+    s._waiting = [batch, interactive]
+
+    chosen, wait = s._select(time.monotonic())
+
+    assert chosen is interactive
+    assert wait == 0.0
+
+
+def test_same_priority_is_served_in_arrival_order():
+    s = scheduler()
+    first = _Ticket(0, None, 10, PRIORITIES['batch'], FAR)
+    second = _Ticket(1, None, 10, PRIORITIES['batch'], FAR)
+    s._waiting = [second, first]
+
+    assert s._select(time.monotonic())[0] is first
+
+
+def test_global_budget_blocks_lower_priority():
+    s = scheduler(tpm=600)
+    s._tokens.tokens = 0
+    s._waiting = [_Ticket(0, None, 500, PRIORITIES['interactive'], FAR), _Ticket(1, None, 1, PRIORITIES['batch'], FAR)]
+
+    chosen, wait = s._select(time.monotonic())
+
+    # La petición por lotes, más pequeña, no se adelanta a la interactiva que espera cuota
+    assert chosen is None
+    assert wait > 0
+
+
+def test_user_budget_throttles_only_that_user():
+    s = scheduler(user_rpm=2)
+    assert s.call(response, user_id=1, tokens=10, timeout=0.05).text == 'ok'
+    assert s.call(response, user_id=1, tokens=10, timeout=0.05).text == 'ok'
+
+    with pytest.raises(QuotaExceededError):
+        s.call(response, user_id=1, tokens=10, timeout=0.05)
+    assert s.call(response, user_id=2, tokens=10, timeout=0.05).text == 'ok'
+
+
+def test_throttled_call_is_retried_and_refunded():
+    s = scheduler()
+    attempts = []
+
+    def fn():
+        attempts.append(s._tokens.tokens)
+        if len(attempts) == 1:
+            raise ResourceExhausted(retry_after=0.01)
+        return response()
+
+    assert s.call(fn, tokens=1000, timeout=1).text == 'ok'
+    assert len(attempts) == 2
+    # La reserva del intento rechazado se devolvió antes del reintento
+    assert attempts[1] == pytest.approx(attempts[0], abs=50)
+
+
+def test_abandoned_call_keeps_reservation():
+    s = scheduler(tpm=6000)
+
+    with pytest.raises(DeadlineExceeded):
+        s.call(lambda: (_ for _ in ()).throw(DeadlineExceeded('llm', abandoned=True)), tokens=3000, timeout=1)
+
+    assert s._tokens.tokens < 6000 - 2900
+
+
+@pytest.mark.parametrize('error', [CircuitOpenError('abierto'), DeadlineExceeded('llm')])
+def test_call_not_sent_is_refunded(error):
+    s = scheduler(tpm=6000)
+
+    def fn():
+        raise error
+
+    with pytest.raises(type(error)):
+        s.call(fn, tokens=3000, timeout=1)
+
+    assert s._tokens.tokens == pytest.approx(6000, abs=1)
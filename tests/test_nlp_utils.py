@@ -0,0 +1,62 @@
+import time
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip('flask')
+
+from app import nlp_utils
+from app.resilience import Deadline, DeadlineExceeded
+
+
+class StubModel:
+    """Modelo con la misma firma que google-generativeai 0.3.2: generate_content(contents) sin request_options."""
+
+    def __init__(self, text='', delay=0.0, error=None):
+        self.text = text
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def generate_content(self, contents):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return SimpleNamespace(text=self.text)
+
+
+def use_model(monkeypatch, model):
+    genai = SimpleNamespace(GenerativeModel=lambda name: model)
+    monkeypatch.setattr(nlp_utils, 'get_genai', lambda: genai)
+
+
+def test_generate_json_extracts_json(app, monkeypatch):
+    model = StubModel('Respuesta:\n```json\n{"compatibilidad": {"porcentaje": "80%"}}\n```')
+    use_model(monkeypatch, model)
+
+    data = nlp_utils._generate_json('prompt', user_id=1, deadline=Deadline(5))
+
+    assert data == {'compatibilidad': {'porcentaje': '80%'}}
+    assert model.calls == 1
+
+
+def test_generate_json_without_json_returns_none(app, monkeypatch):
+    use_model(monkeypatch, StubModel('sin json'))
+
+    assert nlp_utils._generate_json('prompt', deadline=Deadline(5)) is None
+
+
+def test_generate_json_provider_error_returns_none(app, monkeypatch):
+    use_model(monkeypatch, StubModel(error=RuntimeError('500')))
+
+    assert nlp_utils._generate_json('prompt', deadline=Deadline(5)) is None
+
+
+def test_generate_json_enforces_deadline(app, monkeypatch):
+    use_model(monkeypatch, StubModel('{}', delay=2))
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        nlp_utils._generate_json('prompt', deadline=Deadline(0.2))
+    assert time.monotonic() - start < 1
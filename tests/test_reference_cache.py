@@ -0,0 +1,112 @@
+from contextlib import nullcontext
+import pytest
+
+pytest.importorskip('flask')
+
+from app import reference_cache, skill_experience
+from app.reference_cache import ReferenceCache
+from app.reference_data import reference_data_changed
+
+TYPES = [(1, 'Técnica'), (2, 'Blanda')]
+
+
+class FakeCache(ReferenceCache):
+    """ReferenceCache con las filas en memoria en lugar de la base de datos (ya ordenadas como con COLLATE "C")."""
+
+    def __init__(self, skills, aliases=(), max_bytes=1024 * 1024, check_seconds=60):
+        super().__init__(max_bytes, check_seconds)
+        self.skills = list(skills)
+        self.aliases = list(aliases)
+        self.versions = {'standard_skills': 1}
+
+    def _versions(self):
+        return dict(self.versions)
+
+    def _type_rows(self):
+        return TYPES
+
+    def _skill_rows(self):
+        return nullcontext(iter(self.skills))
+
+    def _alias_rows(self):
+        return nullcontext(iter(self.aliases))
+
+
+def test_lookup_skills_uses_names_and_aliases(app):
+    cache = FakeCache([(3, 'django'), (1, 'python'), (2, 'reactjs')], [(1, 'py'), (2, 'react')])
+
+    found = cache.lookup_skills({'python', 'reactjs', 'py', 'react', 'java', 'pythons'})
+
+    assert found == {'python': 1, 'reactjs': 2, 'py': 1, 'react': 2}
+    assert cache.stats()['skills_cached'] is True
+    assert cache.stats()['skills'] == 3
+
+
+def test_name_takes_priority_over_alias(app):
+    cache = FakeCache([(1, 'go')], [(2, 'go')])
+
+    assert cache.lookup_skills({'go'}) == {'go': 1}
+
+
+def test_signal_invalidates_snapshot(app, monkeypatch):
+    cache = FakeCache([(1, 'python')])
+    monkeypatch.setattr(reference_cache, '_cache', cache)
+    assert cache.lookup_skills({'rust'}) == {}
+
+    cache.skills.append((2, 'rust'))
+    assert cache.lookup_skills({'rust'}) == {}  # Versión sin cambios: sigue la copia anterior
+
+    reference_data_changed.send('standard_skills')
+
+    assert cache.lookup_skills({'rust'}) == {'rust': 2}
+    assert cache.metrics['reloads'] == 2
+
+
+def test_version_change_reloads_snapshot(app):
+    cache = FakeCache([(1, 'python')], check_seconds=0)
+    cache.lookup_skills({'python'})
+
+    cache.skills = [(1, 'python3')]
+    cache.versions['standard_skills'] = 2
+
+    assert cache.lookup_skills({'python', 'python3'}) == {'python3': 1}
+    assert cache.metrics['reloads'] == 2
+    assert cache.stats()['versions'] == {'standard_skills': 2}
+
+
+def test_over_budget_keeps_types_and_drops_catalog(app):
+    cache = FakeCache([(i, f'skill_{i:05d}') for i in range(1000)], max_bytes=4096)
+
+    assert cache.lookup_skills({'skill_00001'}) is None
+    assert cache.skill_type_id('tech') == 1
+    stats = cache.stats()
+    assert stats['over_budget'] == 1
+    assert stats['skills_cached'] is False
+    assert stats['bytes'] == 0
+
+
+def test_matcher_falls_back_to_database_per_lookup(app, monkeypatch):
+    cache = FakeCache([(i, f'skill_{i:05d}') for i in range(1000)], max_bytes=4096)
+    monkeypatch.setattr(skill_experience, 'get_reference_cache', lambda: cache)
+    queried = []
+
+    def lookup_database(keys):
+        queried.append(set(keys))
+        return {key: 7 for key in keys if key == 'machine_learning'}
+
+    monkeypatch.setattr(skill_experience, 'lookup_database', lookup_database)
+
+    found = skill_experience.get_skill_matcher().find('Machine Learning con Python')
+
+    assert found == {7}
+    # Solo se consultan los n-gramas del texto, no el catálogo completo
+    assert queried == [{'machine', 'machine_learning', 'machine_learning_con', 'machine_learning_con_python',
+                        'learning', 'learning_con', 'learning_con_python', 'con', 'con_python', 'python'}]
+
+
+def test_matcher_uses_cached_catalog(app, monkeypatch):
+    cache = FakeCache([(1, 'nodejs'), (2, 'python'), (3, 'sql')], [(1, 'node')])
+    monkeypatch.setattr(skill_experience, 'get_reference_cache', lambda: cache)
+    monkeypatch.setattr(skill_experience, 'lookup_database', lambda keys: pytest.fail('consultó la base de datos'))
+
+    assert skill_experience.get_skill_matcher().find('APIs en Node, Python y SQL; lenguaje C') == {1, 2, 3}
@@ -0,0 +1,90 @@
+import time
+import pytest
+
+pytest.importorskip('flask')
+
+from app.resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, call_with_timeout
+
+
+def fail():
+    raise RuntimeError('error del proveedor')
+
+
+def breaker(**kwargs):
+    options = {'failure_threshold': 2, 'window': 5, 'slow_call_seconds': 10.0, 'open_seconds': 0.05}
+    options.update(kwargs)
+    return CircuitBreaker(**options)
+
+
+def open_breaker(b):
+    for _ in range(b.failure_threshold):
+        with pytest.raises(RuntimeError):
+            b.call(fail)
+
+
+def test_opens_after_threshold_failures():
+    b = breaker()
+    with pytest.raises(RuntimeError):
+        b.call(fail)
+    assert b.state == CircuitBreaker.CLOSED
+
+    with pytest.raises(RuntimeError):
+        b.call(fail)
+
+    assert b.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        b.call(lambda: 'ok')
+
+
+def test_slow_calls_count_as_failures():
+    b = breaker(slow_call_seconds=0.0)
+    b.call(lambda: 'ok')
+    b.call(lambda: 'ok')
+
+    assert b.state == CircuitBreaker.OPEN
+
+
+def test_ignored_errors_do_not_open():
+    b = breaker()
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            b.call(fail, ignore=lambda e: True)
+
+    assert b.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_allows_a_single_trial_and_closes_on_success():
+    b = breaker()
+    open_breaker(b)
+    time.sleep(0.06)
+    assert b.state == CircuitBreaker.HALF_OPEN
+
+    b.before_call()
+    with pytest.raises(CircuitOpenError):
+        b.before_call()  # Solo una llamada de prueba a la vez
+    b.check()  # check() no consume la llamada de prueba ni falla en semiabierto
+    b.record(True, 0.01)
+
+    assert b.state == CircuitBreaker.CLOSED
+    assert b.call(lambda: 'ok') == 'ok'
+
+
+def test_half_open_failure_reopens():
+    b = breaker()
+    open_breaker(b)
+    time.sleep(0.06)
+
+    with pytest.raises(RuntimeError):
+        b.call(fail)
+
+    assert b.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        b.check()
+
+
+def test_call_with_timeout_marks_abandoned_calls():
+    with pytest.raises(DeadlineExceeded) as info:
+        call_with_timeout(lambda: time.sleep(0.2), 0.01, 'llm')
+
+    assert info.value.abandoned is True
+    assert call_with_timeout(lambda: 'ok', 1, 'llm') == 'ok'